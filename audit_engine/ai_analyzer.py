@@ -3,39 +3,266 @@ AI Analyzer - Usa LLM reale per analisi intelligente.
 Integra Ollama/CodeGeeX per andare oltre il pattern matching.
 """
 
+import re
 import json
-from typing import Dict, Optional, Any
-from .ollama_client import OllamaClient
-from .models.audit_result import AuditResult
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Any, Tuple
+from .models.audit_result import AuditResult, clip_text
+
+
+# Pattern che giustificano analisi AI, fusi in un'unica alternanza letterale (un solo passaggio sul codice).
+_AI_KEYWORDS = [
+    'import os', 'import subprocess', 'exec(', 'eval(',
+    'password', 'secret', 'key', 'token',
+    'sql', 'query', 'execute',
+    'def ', 'class ',  # Funzioni/classe complesse
+]
+_AI_KEYWORDS_RE = re.compile('|'.join(map(re.escape, _AI_KEYWORDS)))
+
+# Livelli di rischio espliciti e parole chiave negative, con priorità crescente.
+# Un livello esplicito prevale sempre sulle parole negative (che valgono "medium" solo in sua assenza).
+_RISK_PRIORITY = {
+    'vulnerability': 1, 'security': 1, 'risk': 1, 'dangerous': 1, 'unsafe': 1,
+    'low': 2,
+    'medium': 3,
+    'high': 4,
+    'critical': 5,
+}
+_RISK_BY_PRIORITY = {0: 'low', 1: 'medium', 2: 'low', 3: 'medium', 4: 'high', 5: 'critical'}
+_ACTION_BY_RISK = {
+    'critical': 'block',
+    'high': 'block',
+    'medium': 'warn',
+    'low': 'suggest'
+}
+# Lookahead: match a larghezza zero, così keyword sovrapposte non si nascondono a vicenda.
+# Senza IGNORECASE: si scansiona analysis.lower(). Il case-folding Unicode farebbe
+# matchare anche 'ſecurity' o 'hİgh', chiavi assenti in _RISK_PRIORITY.
+_RISK_RE = re.compile('(?=(' + '|'.join(_RISK_PRIORITY) + '))')
+
+
+class _ResultCache:
+    """
+    Cache LRU con TTL dei risultati AI, chiave = digest del contenuto analizzato.
+
+    Thread-safe: analyze_events la interroga da più worker. Memorizza solo il digest
+    (non il codice) per non trattenere in memoria i frammenti analizzati.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[bytes, Tuple[float, AuditResult]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(*parts: str) -> bytes:
+        digest = hashlib.blake2b(digest_size=16)
+        for part in parts:
+            digest.update(part.encode('utf-8', 'surrogatepass'))
+            digest.update(b'\0')
+        return digest.digest()
+
+    def get(self, key: bytes) -> Optional[AuditResult]:
+        if self.max_entries <= 0:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl_seconds > 0 and now - entry[0] > self.ttl_seconds:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: bytes, result: Optional[AuditResult]):
+        # I fallimenti (None) non vanno in cache: sono tipicamente transitori (timeout, rete).
+        if self.max_entries <= 0 or result is None:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic(), result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
 
 
 class AIAnalyzer:
     """Analyzer che usa LLM per analisi intelligente del codice."""
 
-    def __init__(self, ollama_url: str = "http://localhost:11434", model: str = "codegeex", timeout_seconds: int = 30, temperature: float = 0.1):
-        """Inizializza analyzer con Ollama client."""
-        self.client = OllamaClient(ollama_url, model, timeout_seconds=timeout_seconds)
+    def __init__(self, ollama_url: str = "http://localhost:11434", model: str = "codegeex", timeout_seconds: int = 30, temperature: float = 0.1, max_concurrency: int = 5, batch_size: int = 1,
+                 batch_chars: int = 60_000, cache_size: int = 4096, cache_ttl_seconds: float = 300, cache_dir: Optional[str] = None,
+                 stream: bool = False, connect_timeout: float = 3.0):
+        """
+        Inizializza analyzer con Ollama client.
+
+        batch_size: numero massimo di modifiche file inviate in un'unica richiesta LLM da analyze_events
+        (1 = una richiesta per evento).
+        batch_chars: budget di caratteri di codice per richiesta batch; un frammento che da solo lo supera
+        viene analizzato con una richiesta singola.
+        cache_size / cache_ttl_seconds: cache dei risultati per contenuto identico (cache_size 0 = disattivata,
+        TTL 0 = nessuna scadenza); cache_size 0 disattiva anche la cache risposte del client.
+        cache_dir: persistenza su disco delle risposte LLM (None = solo memoria).
+        stream: analisi codice ricevute in streaming da Ollama.
+        connect_timeout: timeout di connessione a Ollama (timeout_seconds resta quello di lettura).
+        """
+        # Import differito: ollama_client porta con sé requests (~60 ms di import), inutile per chi
+        # usa solo il pattern matching (es. gli hook Git di auditor_gate, che disattivano l'AI).
+        from .ollama_client import OllamaClient
+
+        self.client = OllamaClient(ollama_url, model, timeout_seconds=timeout_seconds,
+                                   cache_size=1024 if int(cache_size) > 0 else 0, cache_dir=cache_dir,
+                                   stream=stream, connect_timeout=connect_timeout)
         self.temperature = float(temperature)
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.batch_size = max(1, int(batch_size))
+        self.batch_chars = max(1, int(batch_chars))
+        self._cache = _ResultCache(int(cache_size), float(cache_ttl_seconds))
 
     def test_connection(self) -> bool:
         """Test connessione al LLM."""
         return self.client.test_connection()
 
-    def analyze_event(self, event: Dict[str, Any]) -> Optional[AuditResult]:
-        """Analizza un evento usando LLM per ragionamento intelligente."""
+    def close(self):
+        """Rilascia le connessioni HTTP del client Ollama."""
+        self.client.close()
+
+    def analyze_event(self, event: Dict[str, Any], payload_lower: Optional[str] = None,
+                      quick_ok: Optional[bool] = None) -> Optional[AuditResult]:
+        """
+        Analizza un evento usando LLM per ragionamento intelligente.
+
+        payload_lower: testo dell'evento già in minuscolo (se il chiamante lo ha calcolato), evita un secondo lower().
+        quick_ok: esito del pre-filtro keyword se il chiamante lo ha già calcolato, evita una seconda scansione.
+        """
 
         event_type = event.get('type', '')
 
         if event_type == 'tool':
-            return self._analyze_tool_event(event)
+            return self._analyze_tool_event(event, payload_lower, quick_ok)
         elif event_type == 'status':
-            return self._analyze_status_event(event)
+            return self._analyze_status_event(event, payload_lower)
         elif event_type == 'lifecycle':
             return self._analyze_lifecycle_event(event)
 
         return None
 
-    def _analyze_tool_event(self, event: Dict[str, Any]) -> Optional[AuditResult]:
+    def analyze_events(self, events: List[Dict[str, Any]],
+                       payloads_lower: Optional[List[Optional[str]]] = None,
+                       quick_checks: Optional[List[Optional[bool]]] = None) -> List[Optional[AuditResult]]:
+        """
+        Analizza più eventi, con chiamate LLM concorrenti.
+
+        Le chiamate sono I/O-bound: con più richieste in volo Ollama le serve in parallelo
+        (OLLAMA_NUM_PARALLEL) e la sessione HTTP condivisa riusa le connessioni del pool.
+        Con batch_size > 1 le modifiche file idonee vengono raggruppate in richieste multi-frammento,
+        entro batch_size frammenti e batch_chars caratteri per richiesta.
+        L'ordine dei risultati corrisponde a quello degli eventi.
+        """
+        if payloads_lower is None:
+            payloads_lower = [None] * len(events)
+        if quick_checks is None:
+            quick_checks = [None] * len(events)
+
+        groups: List[List[int]] = []
+        batchable: List[int] = []
+        for idx, event in enumerate(events):
+            if self.batch_size > 1 and self._is_ai_file_edit(event, payloads_lower[idx], quick_checks[idx]):
+                batchable.append(idx)
+            else:
+                groups.append([idx])
+        groups.extend(self._batch_groups(events, batchable))
+
+        def run(group: List[int]) -> List[Optional[AuditResult]]:
+            if len(group) == 1:
+                return [self.analyze_event(events[group[0]], payloads_lower[group[0]], quick_checks[group[0]])]
+            return self._analyze_file_edits_batch([events[i].get('tool_input', {}) for i in group])
+
+        if len(groups) <= 1 or self.max_concurrency == 1:
+            outputs = [run(group) for group in groups]
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(groups))) as pool:
+                outputs = list(pool.map(run, groups))
+
+        results: List[Optional[AuditResult]] = [None] * len(events)
+        for group, output in zip(groups, outputs):
+            for idx, result in zip(group, output):
+                results[idx] = result
+        return results
+
+    def _batch_groups(self, events: List[Dict[str, Any]], batchable: List[int]) -> List[List[int]]:
+        """Raggruppa in ordine le modifiche file idonee rispettando batch_size e batch_chars."""
+        groups: List[List[int]] = []
+        current: List[int] = []
+        current_chars = 0
+        for idx in batchable:
+            size = len(events[idx].get('tool_input', {}).get('new_string', ''))
+            if current and (len(current) >= self.batch_size or current_chars + size > self.batch_chars):
+                groups.append(current)
+                current, current_chars = [], 0
+            current.append(idx)
+            current_chars += size
+        if current:
+            groups.append(current)
+        return groups
+
+    def _is_ai_file_edit(self, event: Dict[str, Any], payload_lower: Optional[str] = None,
+                         quick_ok: Optional[bool] = None) -> bool:
+        """True se l'evento è una modifica file che supera il pre-filtro AI."""
+        if event.get('type', '') != 'tool' or event.get('tool_name', '') != 'FileEdit':
+            return False
+        if quick_ok is not None:
+            return quick_ok
+        return self._quick_pattern_check(event.get('tool_input', {}).get('new_string', ''), payload_lower)
+
+    def _analyze_file_edits_batch(self, tool_inputs: List[Dict]) -> List[Optional[AuditResult]]:
+        """Analizza più modifiche file con una sola richiesta LLM; le sezioni mancanti ripiegano sulla richiesta singola."""
+        results: List[Optional[AuditResult]] = []
+        misses: List[int] = []
+        for idx, tool_input in enumerate(tool_inputs):
+            cached = self._cache.get(self._file_edit_cache_key(tool_input))
+            results.append(cached)
+            if cached is None:
+                misses.append(idx)
+        if not misses:
+            return results
+
+        analyses = self.client.analyze_code_batch([
+            (
+                tool_inputs[idx].get('new_string', ''),
+                {"file_path": tool_inputs[idx].get('file_path', ''), "operation": "file_edit"},
+            )
+            for idx in misses
+        ])
+        if analyses is None:
+            # Richiesta fallita (timeout/rete): ripetere per singolo frammento moltiplicherebbe l'attesa.
+            return results
+
+        for idx, analysis in zip(misses, analyses):
+            tool_input = tool_inputs[idx]
+            if analysis:
+                results[idx] = self._file_edit_result(tool_input, analysis)
+                self._cache.put(self._file_edit_cache_key(tool_input), results[idx])
+            else:
+                # Il gruppo contiene solo modifiche che hanno già superato il pre-filtro.
+                results[idx] = self._analyze_file_edit_ai(tool_input, quick_ok=True)
+        return results
+
+    @staticmethod
+    def _file_edit_cache_key(tool_input: Dict) -> bytes:
+        return _ResultCache.key('file_edit', tool_input.get('file_path', ''), tool_input.get('new_string', ''))
+
+    def _analyze_tool_event(self, event: Dict[str, Any], payload_lower: Optional[str] = None,
+                            quick_ok: Optional[bool] = None) -> Optional[AuditResult]:
         """Analizza evento tool con LLM."""
 
         tool_name = event.get('tool_name', '')
@@ -44,7 +271,7 @@ class AIAnalyzer:
         if tool_name == 'Bash':
             return self._analyze_bash_command_ai(tool_input)
         elif tool_name == 'FileEdit':
-            return self._analyze_file_edit_ai(tool_input)
+            return self._analyze_file_edit_ai(tool_input, payload_lower, quick_ok)
 
         return None
 
@@ -53,6 +280,11 @@ class AIAnalyzer:
 
         command = tool_input.get('command', '')
 
+        cache_key = _ResultCache.key('bash', command)
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            return cached
+
         analysis = self.client.analyze_code(
             f"Comando shell: {command}",
             context={"type": "bash_command", "command": command}
@@ -62,25 +294,35 @@ class AIAnalyzer:
             # Estrai livello rischio dall'analisi AI
             risk_level = self._extract_risk_level(analysis)
 
-            return AuditResult(
+            result = AuditResult(
                 rule_name="ai_bash_analysis",
                 severity=risk_level,
                 action=self._risk_to_action(risk_level),
                 description="Analisi AI comando bash",
                 evidence=command,
-                suggestion=analysis[:500] + "..." if len(analysis) > 500 else analysis
+                suggestion=clip_text(analysis, 500)
             )
+            self._cache.put(cache_key, result)
+            return result
 
         return None
 
-    def _analyze_file_edit_ai(self, tool_input: Dict) -> Optional[AuditResult]:
+    def _analyze_file_edit_ai(self, tool_input: Dict, code_lower: Optional[str] = None,
+                              quick_ok: Optional[bool] = None) -> Optional[AuditResult]:
         """Analizza modifica file con LLM."""
 
         file_path = tool_input.get('file_path', '')
         new_string = tool_input.get('new_string', '')
 
         # Pre-filtra con pattern matching veloce
-        if self._quick_pattern_check(new_string):
+        if quick_ok is None:
+            quick_ok = self._quick_pattern_check(new_string, code_lower)
+        if quick_ok:
+            cache_key = self._file_edit_cache_key(tool_input)
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                return cached
+
             # Usa LLM per analisi profonda
             analysis = self.client.analyze_code(
                 new_string,
@@ -91,38 +333,55 @@ class AIAnalyzer:
             )
 
             if analysis:
-                risk_level = self._extract_risk_level(analysis)
-
-                return AuditResult(
-                    rule_name="ai_code_analysis",
-                    severity=risk_level,
-                    action=self._risk_to_action(risk_level),
-                    description=f"Analisi AI modifica file: {file_path}",
-                    location=file_path,
-                    evidence=new_string[:300] + "..." if len(new_string) > 300 else new_string,
-                    suggestion=analysis[:800] + "..." if len(analysis) > 800 else analysis
-                )
+                result = self._file_edit_result(tool_input, analysis)
+                self._cache.put(cache_key, result)
+                return result
 
         return None
 
-    def _analyze_status_event(self, event: Dict[str, Any]) -> Optional[AuditResult]:
+    def _file_edit_result(self, tool_input: Dict, analysis: str) -> AuditResult:
+        """Costruisce il risultato di audit di una modifica file a partire dall'analisi LLM."""
+        file_path = tool_input.get('file_path', '')
+        new_string = tool_input.get('new_string', '')
+        risk_level = self._extract_risk_level(analysis)
+
+        return AuditResult(
+            rule_name="ai_code_analysis",
+            severity=risk_level,
+            action=self._risk_to_action(risk_level),
+            description=f"Analisi AI modifica file: {file_path}",
+            location=file_path,
+            evidence=clip_text(new_string, 300),
+            suggestion=clip_text(analysis, 800)
+        )
+
+    def _analyze_status_event(self, event: Dict[str, Any], status_lower: Optional[str] = None) -> Optional[AuditResult]:
         """Analizza evento status con LLM."""
 
         status_detail = event.get('status_detail', '')
+        if status_lower is None:
+            status_lower = status_detail.lower()
+
+        if 'commit' in status_lower:
+            cache_key = _ResultCache.key('commit', status_detail)
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                return cached
 
-        if 'commit' in status_detail.lower():
             # Analizza qualità commit con LLM
             analysis = self.client.analyze_commit(status_detail, "changes summary")
 
             if analysis:
-                return AuditResult(
+                result = AuditResult(
                     rule_name="ai_commit_analysis",
                     severity="low",  # I commit sono generalmente low risk
                     action="suggest",
                     description="Analisi AI qualità commit",
                     evidence=status_detail,
-                    suggestion=analysis[:500] + "..." if len(analysis) > 500 else analysis
+                    suggestion=clip_text(analysis, 500)
                 )
+                self._cache.put(cache_key, result)
+                return result
 
         return None
 
@@ -131,49 +390,27 @@ class AIAnalyzer:
         # Per ora, lifecycle events non richiedono AI analysis
         return None
 
-    def _quick_pattern_check(self, code: str) -> bool:
+    def _quick_pattern_check(self, code: str, code_lower: Optional[str] = None) -> bool:
         """Controllo veloce per decidere se usare LLM."""
-        # Pattern che giustificano analisi AI
-        ai_patterns = [
-            'import os', 'import subprocess', 'exec(', 'eval(',
-            'password', 'secret', 'key', 'token',
-            'sql', 'query', 'execute',
-            'def ', 'class ',  # Funzioni/classe complesse
-        ]
-
-        return any(pattern in code.lower() for pattern in ai_patterns)
+        if code_lower is None:
+            code_lower = code.lower()
+        return _AI_KEYWORDS_RE.search(code_lower) is not None
 
     def _extract_risk_level(self, analysis: str) -> str:
         """Estrae livello rischio dal testo dell'analisi AI."""
 
-        analysis_lower = analysis.lower()
+        # Un solo passaggio sul testo: si tiene la priorità massima incontrata.
+        best = 0
+        for match in _RISK_RE.finditer(analysis.lower()):
+            best = max(best, _RISK_PRIORITY[match.group(1)])
+            if best == 5:
+                break
 
-        if 'critical' in analysis_lower:
-            return 'critical'
-        elif 'high' in analysis_lower:
-            return 'high'
-        elif 'medium' in analysis_lower:
-            return 'medium'
-        elif 'low' in analysis_lower:
-            return 'low'
-        else:
-            # Default basato su presenza di parole chiave negative
-            negative_words = ['vulnerability', 'security', 'risk', 'dangerous', 'unsafe']
-            if any(word in analysis_lower for word in negative_words):
-                return 'medium'
-            return 'low'
+        return _RISK_BY_PRIORITY[best]
 
     def _risk_to_action(self, risk_level: str) -> str:
         """Converte livello rischio in azione appropriata."""
-
-        actions = {
-            'critical': 'block',
-            'high': 'block',
-            'medium': 'warn',
-            'low': 'suggest'
-        }
-
-        return actions.get(risk_level, 'suggest')
+        return _ACTION_BY_RISK.get(risk_level, 'suggest')
 
     def get_stats(self) -> Dict[str, Any]:
         """Statistiche di utilizzo LLM."""
@@ -181,5 +418,9 @@ class AIAnalyzer:
         return {
             "llm_enabled": True,
             "model": self.client.model,
+            "cache_hits": self._cache.hits,
+            "cache_misses": self._cache.misses,
+            "llm_cache_hits": self.client.cache_hits,
+            "llm_cache_misses": self.client.cache_misses,
             "connection_status": "connected" if self.test_connection() else "disconnected"
         }
@@ -4,19 +4,201 @@ Sistema ibrido: pattern matching veloce + AI analysis profonda.
 """
 
 import re
+import sys
 import json
-try:
-    import yaml  # type: ignore
-except ModuleNotFoundError:  # pragma: no cover
-    yaml = None
-from typing import Dict, List, Optional, Any
+import functools
+from typing import Dict, List, Optional, Any, Callable, Pattern, Sequence, Tuple
 from pathlib import Path
-from dataclasses import dataclass
-from .ai_analyzer import AIAnalyzer
-from .models.audit_result import AuditResult
+from dataclasses import dataclass, field
+from .ai_analyzer import AIAnalyzer, _AI_KEYWORDS
+from .models.audit_result import AuditResult, DATACLASS_SLOTS, clip_text
 
 
-@dataclass
+_LEADING_FLAGS_RE = re.compile(r'^\(\?([aiLmsux]+)\)')
+
+# Backreference numeriche (\1) e condizionali su gruppo numerato ((?(1)...)): nello scanner fuso
+# ogni pattern è avvolto in un gruppo "_p<indice>" e la numerazione dei gruppi cambia.
+_NUMBERED_GROUP_REF_RE = re.compile(r'(?<!\\)(?:\\\\)*\\[1-9]|\(\?\(\d')
+
+
+# Regole già lette e compilate per (path, mtime_ns, size): più engine nello stesso processo non
+# ri-parsano lo YAML né ricostruiscono le AuditRule (condivise in sola lettura).
+_RULES_CACHE: Dict[Tuple[str, int, int], Tuple["AuditRule", ...]] = {}
+
+
+def _yaml_safe_load() -> Optional[Callable[[Any], Any]]:
+    """`yaml.load` con il CSafeLoader di libyaml quando disponibile (stessa semantica di safe_load).
+
+    pyyaml viene importato solo quando c'è un file regole da leggere; None se non è installato.
+    """
+    try:
+        import yaml  # type: ignore
+    except ModuleNotFoundError:  # pragma: no cover
+        return None
+    return functools.partial(yaml.load, Loader=getattr(yaml, 'CSafeLoader', None) or yaml.SafeLoader)
+
+
+def _scoped_pattern(pattern: str) -> str:
+    """Converte flag inline globali iniziali (es. "(?i)") in flag di gruppo, ammessi dentro un'alternanza."""
+    m = _LEADING_FLAGS_RE.match(pattern)
+    if not m:
+        return pattern
+    flags, body = m.group(1), pattern[m.end():]
+    if 'x' in flags:
+        # In modalità verbose un commento finale consumerebbe la parentesi di chiusura.
+        body += '\n'
+    return f'(?{flags}:{body})'
+
+
+@functools.lru_cache(maxsize=32)
+def _compile_scanner(patterns: Tuple[Optional[str], ...], flags: int = 0) -> Optional[Pattern[str]]:
+    """
+    Fonde più pattern in un'unica alternanza con gruppi nominati "_p<indice>" (indici della tupla,
+    None = posizione senza pattern). Restituisce None se i pattern non sono combinabili
+    (es. nomi di gruppo duplicati, riferimenti a gruppi numerati): il chiamante ricade allora
+    sul controllo pattern per pattern. Memorizzata: engine con le stesse regole condividono lo scanner.
+    """
+    if any(pattern and _NUMBERED_GROUP_REF_RE.search(pattern) for pattern in patterns):
+        return None
+    parts = [
+        f'(?P<_p{idx}>{_scoped_pattern(pattern)})'
+        for idx, pattern in enumerate(patterns)
+        if pattern
+    ]
+    if not parts:
+        return None
+    try:
+        return re.compile('|'.join(parts), flags)
+    except re.error:
+        return None
+
+
+def _first_match_index(scanner: Pattern[str], patterns: Sequence[Optional[Pattern[str]]], text: str) -> Optional[int]:
+    """
+    Indice del primo pattern (in ordine di lista) che matcha text, o None.
+
+    Un solo passaggio di scanner nel caso comune (nessun match). L'alternanza restituisce il match
+    più a sinistra, non il pattern con priorità maggiore: si ricontrollano solo i pattern precedenti.
+    """
+    match = scanner.search(text)
+    if match is None:
+        return None
+    if match.lastgroup is None:
+        # Ogni alternativa è un gruppo "_p<indice>", quindi non dovrebbe accadere: si ricontrolla tutto.
+        return next((idx for idx, compiled in enumerate(patterns)
+                     if compiled is not None and compiled.search(text)), None)
+    found = int(match.lastgroup[2:])
+    for idx in range(found):
+        compiled = patterns[idx]
+        if compiled is not None and compiled.search(text):
+            return idx
+    return found
+
+
+# Pattern compilati una sola volta a import-time: analyze_event è il percorso caldo.
+# Pattern interni tutti minuscoli, applicati al testo già in minuscolo (_payload_lower):
+# il matching case-sensitive di re è più veloce di IGNORECASE.
+_BASH_PATTERNS = [
+    (re.compile(r'rm\s+-rf\s+/'), 'dangerous_rm', 'high', 'block'),
+    (re.compile(r'>/dev/null'), 'redirect_dev_null', 'medium', 'warn'),
+    (re.compile(r'chmod\s+777'), 'excessive_permissions', 'medium', 'warn'),
+    (re.compile(r'curl.*\|.*bash'), 'pipe_to_bash', 'high', 'block'),
+    (re.compile(r'wget.*\|.*sh'), 'pipe_to_sh', 'high', 'block'),
+]
+_BASH_COMPILED = [compiled for compiled, _name, _severity, _action in _BASH_PATTERNS]
+_BASH_SCANNER = _compile_scanner(tuple(compiled.pattern for compiled in _BASH_COMPILED))
+
+# Limitazione intenzionale: il gate Git non deve "autobloccarsi" su regex/pattern nel codice stesso.
+# Il pattern rileva assegnazioni o key/value reali, non semplici occorrenze testuali (es. definizioni di regex).
+# Applicato al testo in minuscolo, come i pattern bash.
+_SECRETS_RE = re.compile(r"""(?x)
+\b(?:
+    api_key|apikey|secret|token|password|access_key|private_key
+)\b
+\s*(?:=|:)\s*
+['"][^'"\n]{10,}['"]
+""")
+# Ogni alternativa di _SECRETS_RE contiene uno di questi letterali: la ricerca di sottostringa
+# (vettorizzata in CPython) scarta il testo pulito senza far tentare la regex a ogni posizione.
+_SECRETS_LITERALS = ('key', 'secret', 'token', 'password')
+
+# Entrambi i pattern producono lo stesso issue: basta sapere se almeno uno matcha.
+_SQL_RE = re.compile(r'execute\(.*\+.*\)|cursor\.execute\(.*%.*\)')
+# Letterale comune a entrambi i rami di _SQL_RE, usato come prefiltro.
+_SQL_LITERAL = 'execute('
+
+# Keyword che giustificano l'analisi AI: un'unica alternanza letterale scansiona il testo una volta sola.
+_COMPLEX_KEYWORDS = [
+    'import ', 'def ', 'class ', 'try:', 'except:',
+    'sql', 'query', 'execute', 'connect',
+    'password', 'secret', 'key', 'token',
+    'eval(', 'exec(', 'subprocess', 'os.system'
+]
+_COMPLEX_KEYWORDS_RE = re.compile('|'.join(map(re.escape, _COMPLEX_KEYWORDS)))
+
+# Scansione fusa per le modifiche file: un solo passaggio sul testo minuscolo calcola sia
+# il predicato "complesso" dell'engine sia il pre-filtro dell'AIAnalyzer (bitmask).
+_KW_COMPLEX = 1
+_KW_AI = 2
+_KW_ALL = _KW_COMPLEX | _KW_AI
+
+
+def _build_keyword_flags() -> Dict[str, int]:
+    """
+    Mappa keyword -> bit dei predicati a cui contribuisce. Ogni keyword eredita i bit delle keyword
+    che contiene ("import os" implica "import "): il lookahead riporta una sola alternativa per
+    posizione (la più lunga) e le altre non devono andare perse.
+    """
+    base: Dict[str, int] = {}
+    for keyword in _COMPLEX_KEYWORDS:
+        base[keyword] = base.get(keyword, 0) | _KW_COMPLEX
+    for keyword in _AI_KEYWORDS:
+        base[keyword] = base.get(keyword, 0) | _KW_AI
+    flags: Dict[str, int] = {}
+    for keyword in base:
+        flags[keyword] = 0
+        for other, bits in base.items():
+            if other in keyword:
+                flags[keyword] |= bits
+    return flags
+
+
+_KEYWORD_FLAGS = _build_keyword_flags()
+_KEYWORD_SCAN_RE = re.compile(
+    '(?=(' + '|'.join(map(re.escape, sorted(_KEYWORD_FLAGS, key=len, reverse=True))) + '))'
+)
+
+
+def _ai_content_key(event: Dict) -> Optional[Tuple[Optional[str], ...]]:
+    """
+    Chiave del contenuto che l'AI analizza per un evento tool (strumento, file, comando, codice).
+
+    Due eventi con la stessa chiave ricevono lo stesso risultato AI (è ciò che la cache
+    dell'AIAnalyzer già restituisce). None se l'evento non è deduplicabile.
+    """
+    if event.get('type') != 'tool':
+        return None
+    tool_input = event.get('tool_input')
+    if not isinstance(tool_input, dict):
+        return None
+    key = (event.get('tool_name'), tool_input.get('file_path'),
+           tool_input.get('command'), tool_input.get('new_string'))
+    if all(value is None or isinstance(value, str) for value in key):
+        return key
+    return None
+
+
+def _scan_keywords(text_lower: str) -> int:
+    """Bitmask _KW_* delle keyword presenti nel testo (già minuscolo); si ferma appena tutti i bit sono noti."""
+    found = 0
+    for match in _KEYWORD_SCAN_RE.finditer(text_lower):
+        found |= _KEYWORD_FLAGS[match.group(1)]
+        if found == _KW_ALL:
+            break
+    return found
+
+
+@dataclass(**DATACLASS_SLOTS)
 class AuditRule:
     """Rappresenta una regola di auditing."""
     name: str
@@ -26,6 +208,40 @@ class AuditRule:
     description: str = ""
     max_lines: Optional[int] = None
     require_tests: bool = False
+    compiled: Optional[Pattern[str]] = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        # Stringhe lette da YAML non sono internate: internarle rende i confronti con i letterali
+        # ('warn', 'block', ...) in update_stats un confronto di identità.
+        if isinstance(self.severity, str):
+            self.severity = sys.intern(self.severity)
+        if isinstance(self.action, str):
+            self.action = sys.intern(self.action)
+        # Compilazione unica per regola: un pattern invalido fallisce al caricamento, non per evento.
+        if self.pattern:
+            self.compiled = re.compile(self.pattern, re.IGNORECASE)
+
+
+@dataclass(**DATACLASS_SLOTS)
+class AuditStats:
+    """Contatori del motore: attributi a slot invece di chiavi di dict sul percorso caldo."""
+    events_processed: int = 0
+    issues_found: int = 0
+    warnings_sent: int = 0
+    blocks_applied: int = 0
+    ai_analyses: int = 0
+    pattern_matches: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        """Snapshot dei contatori come dict (formato storico di AuditorEngine.stats)."""
+        return {
+            'events_processed': self.events_processed,
+            'issues_found': self.issues_found,
+            'warnings_sent': self.warnings_sent,
+            'blocks_applied': self.blocks_applied,
+            'ai_analyses': self.ai_analyses,
+            'pattern_matches': self.pattern_matches,
+        }
 
 
 class AuditorEngine:
@@ -35,6 +251,17 @@ class AuditorEngine:
         """Inizializza il motore di auditing."""
         self.config = config
         self.rules = self._load_rules()
+        self._rule_patterns = [rule.compiled for rule in self.rules]
+        self._rules_scanner = _compile_scanner(tuple(rule.pattern for rule in self.rules), re.IGNORECASE)
+        self._has_pattern_rules = any(self._rule_patterns)
+        # Routing per tipo evento: un lookup invece della catena di confronti; metodi legati
+        # a self, quindi gli override nelle sottoclassi restano validi.
+        self._pattern_dispatch = {
+            'tool': self._analyze_tool_event,
+            'status': self._analyze_status_event,
+            'message': self._analyze_message_event,
+            'lifecycle': self._analyze_lifecycle_event,
+        }
         self.active = False
 
         # AI Analyzer (opzionale)
@@ -44,22 +271,33 @@ class AuditorEngine:
                 ollama_url = getattr(config, 'ollama_url', 'http://localhost:11434')
                 ollama_model = getattr(config, 'ollama_model', 'codegeex')
                 ai_timeout = int(getattr(config, 'ai_timeout', 30))
+                ai_connect_timeout = float(getattr(config, 'ai_connect_timeout', 3.0))
                 ai_temperature = float(getattr(config, 'ai_temperature', 0.1))
-                self.ai_analyzer = AIAnalyzer(ollama_url, ollama_model, timeout_seconds=ai_timeout, temperature=ai_temperature)
+                max_concurrency = int(getattr(config, 'max_concurrent_analyses', 5))
+                ai_batch_size = int(getattr(config, 'ai_batch_size', 1))
+                ai_batch_chars = int(getattr(config, 'ai_batch_chars', 60_000))
+                ai_stream = bool(getattr(config, 'ai_stream', False))
+                cache_enabled = bool(getattr(config, 'cache_enabled', True))
+                cache_ttl = float(getattr(config, 'cache_ttl_seconds', 300))
+                cache_dir = getattr(config, 'cache_dir', '') or None
+                self.ai_analyzer = AIAnalyzer(ollama_url, ollama_model, timeout_seconds=ai_timeout,
+                                              temperature=ai_temperature, max_concurrency=max_concurrency,
+                                              batch_size=ai_batch_size, batch_chars=ai_batch_chars,
+                                              cache_size=4096 if cache_enabled else 0,
+                                              cache_ttl_seconds=cache_ttl, cache_dir=cache_dir,
+                                              stream=ai_stream, connect_timeout=ai_connect_timeout)
                 print(f"🤖 AI Analyzer inizializzato: {ollama_model} @ {ollama_url}")
             except Exception as e:
                 print(f"⚠️  AI Analyzer non disponibile: {e}")
                 self.ai_analyzer = None
 
         # Statistiche
-        self.stats = {
-            'events_processed': 0,
-            'issues_found': 0,
-            'warnings_sent': 0,
-            'blocks_applied': 0,
-            'ai_analyses': 0,
-            'pattern_matches': 0
-        }
+        self._stats = AuditStats()
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Snapshot delle statistiche (dict materializzato su richiesta)."""
+        return self._stats.as_dict()
 
     def start(self):
         """Avvia il motore di auditing."""
@@ -69,54 +307,134 @@ class AuditorEngine:
     def stop(self):
         """Ferma il motore di auditing."""
         self.active = False
+        if self.ai_analyzer:
+            self.ai_analyzer.close()
         print("🛑 Motore di auditing fermato")
         self._print_stats()
 
     def analyze_event(self, event: Dict) -> Optional[AuditResult]:
         """Analizza un evento e restituisce il risultato dell'audit."""
-        if not self.active:
-            return None
+        return self.analyze_events([event])[0]
 
-        self.stats['events_processed'] += 1
+    def analyze_events(self, events: List[Dict]) -> List[Optional[AuditResult]]:
+        """
+        Analizza un batch di eventi; restituisce un risultato (o None) per evento, nello stesso ordine.
 
-        # Prima: Pattern matching veloce
-        pattern_result = self._analyze_with_patterns(event)
-        if pattern_result:
-            self.stats['pattern_matches'] += 1
-            self.update_stats(pattern_result)
-            return pattern_result
+        Il pattern matching resta sequenziale (CPU-bound, veloce); gli eventi che richiedono AI
+        vengono inviati insieme all'AIAnalyzer, che esegue le chiamate LLM in parallelo.
+        Le statistiche sono aggiornate solo dal thread chiamante. Se l'analisi AI fallisce,
+        i risultati del pattern matching vengono comunque restituiti.
+        """
+        results: List[Optional[AuditResult]] = [None] * len(events)
+        if not self.active:
+            return results
+
+        ai_indices: List[int] = []
+        ai_payloads: List[Optional[str]] = []
+        ai_quick_checks: List[Optional[bool]] = []
+        # Eventi identici nello stesso batch vanno all'AI una volta sola: con le chiamate in
+        # parallelo nessuno troverebbe in cache il risultato dell'altro.
+        ai_positions: Dict[Tuple[Optional[str], ...], int] = {}
+        ai_duplicates: List[Tuple[int, int]] = []  # (indice evento, posizione in ai_indices)
+
+        for idx, event in enumerate(events):
+            self._stats.events_processed += 1
+
+            # Eventi non-dict (None, payload corrotti): nessun risultato, invece di un crash
+            # a valle su event.get; il routing per tipo resta il lookup in _pattern_dispatch.
+            if not isinstance(event, dict):
+                continue
+
+            # Un solo lower() per evento, condiviso da pattern matching e predicati keyword a valle.
+            payload_lower = self._payload_lower(event)
+
+            # Prima: Pattern matching veloce
+            pattern_result = self._analyze_with_patterns(event, payload_lower)
+            if pattern_result:
+                self._stats.pattern_matches += 1
+                self.update_stats(pattern_result)
+                results[idx] = pattern_result
+                continue
+
+            # Secondo: AI analysis se disponibile e evento merita attenzione
+            if self.ai_analyzer:
+                # Per le modifiche file una sola scansione keyword, condivisa da engine e pre-filtro AI.
+                keyword_flags = None
+                if (payload_lower is not None and event.get('type', '') == 'tool'
+                        and event.get('tool_name', '') == 'FileEdit'):
+                    keyword_flags = _scan_keywords(payload_lower)
+                if self._should_use_ai(event, payload_lower, keyword_flags):
+                    content_key = _ai_content_key(event)
+                    if content_key is not None:
+                        first = ai_positions.get(content_key)
+                        if first is not None:
+                            ai_duplicates.append((idx, first))
+                            continue
+                        ai_positions[content_key] = len(ai_indices)
+                    ai_indices.append(idx)
+                    ai_payloads.append(payload_lower)
+                    ai_quick_checks.append(None if keyword_flags is None else bool(keyword_flags & _KW_AI))
+
+        if ai_indices:
+            # Un errore dell'AI non deve far perdere i risultati del pattern matching già calcolati:
+            # gli eventi destinati all'AI restano senza risultato (None).
+            try:
+                ai_results = self.ai_analyzer.analyze_events([events[i] for i in ai_indices], ai_payloads,
+                                                             ai_quick_checks)
+            except Exception as e:
+                print(f"⚠️  Errore analisi AI ({len(ai_indices)} eventi senza risultato AI): {e}")
+                return results
+            ai_pairs = list(zip(ai_indices, ai_results))
+            ai_pairs.extend((idx, ai_results[first]) for idx, first in ai_duplicates)
+            for idx, ai_result in ai_pairs:
+                if ai_result:
+                    self._stats.ai_analyses += 1
+                    self.update_stats(ai_result)
+                    results[idx] = ai_result
+
+        return results
+
+    def _payload_lower(self, event: Dict) -> Optional[str]:
+        """
+        Restituisce in minuscolo il testo dell'evento su cui operano pattern interni e predicati keyword.
 
-        # Secondo: AI analysis se disponibile e evento merita attenzione
-        if self.ai_analyzer and self._should_use_ai(event):
-            ai_result = self.ai_analyzer.analyze_event(event)
-            if ai_result:
-                self.stats['ai_analyses'] += 1
-                self.update_stats(ai_result)
-                return ai_result
+        None se nessun controllo a valle lo usa (es. comandi terminal): il lower() sarebbe sprecato.
+        """
+        event_type = event.get('type', '')
+
+        if event_type == 'tool':
+            tool_name = event.get('tool_name', '')
+            if tool_name == 'FileEdit':
+                return event.get('tool_input', {}).get('new_string', '').lower()
+            if tool_name == 'Bash':
+                return event.get('tool_input', {}).get('command', '').lower()
+            return None
+        elif event_type == 'status':
+            return event.get('status_detail', '').lower()
 
         return None
 
-    def _analyze_with_patterns(self, event: Dict) -> Optional[AuditResult]:
-        """Analisi veloce con pattern matching."""
+    def _analyze_with_patterns(self, event: Dict, payload_lower: Optional[str] = None) -> Optional[AuditResult]:
+        """
+        Analisi veloce con pattern matching.
+
+        payload_lower: risultato di _payload_lower già calcolato dal chiamante.
+        """
         event_type = event.get('type', '')
 
-        # Routing basato sul tipo di evento
-        if event_type == 'tool':
-            result = self._analyze_tool_event(event)
-        elif event_type == 'status':
-            result = self._analyze_status_event(event)
-        elif event_type == 'message':
-            result = self._analyze_message_event(event)
-        elif event_type == 'lifecycle':
-            result = self._analyze_lifecycle_event(event)
-        else:
-            # Analisi generica
-            result = self._analyze_generic_event(event)
+        # Routing basato sul tipo di evento (tipi sconosciuti o non stringa: analisi generica)
+        handler = self._pattern_dispatch.get(event_type) if isinstance(event_type, str) else None
+        if handler is None:
+            return self._analyze_generic_event(event)
+        return handler(event, payload_lower)
 
-        return result
+    def _should_use_ai(self, event: Dict, payload_lower: Optional[str] = None,
+                       keyword_flags: Optional[int] = None) -> bool:
+        """
+        Determina se un evento merita analisi AI.
 
-    def _should_use_ai(self, event: Dict) -> bool:
-        """Determina se un evento merita analisi AI."""
+        keyword_flags: bitmask di _scan_keywords già calcolata dal chiamante (modifiche file).
+        """
         event_type = event.get('type', '')
 
         if event_type == 'tool':
@@ -127,7 +445,11 @@ class AuditorEngine:
                 if tool_name == 'FileEdit':
                     code = tool_input.get('new_string', '')
                     # Usa AI per codice complesso
-                    return len(code) > 100 or self._contains_complex_patterns(code)
+                    if len(code) > 100:
+                        return True
+                    if keyword_flags is not None:
+                        return bool(keyword_flags & _KW_COMPLEX)
+                    return self._contains_complex_patterns(code, payload_lower)
                 elif tool_name == 'Bash':
                     command = tool_input.get('command', '')
                     # Usa AI per comandi complessi
@@ -136,103 +458,90 @@ class AuditorEngine:
                     return True  # Sempre usa AI per comandi terminal
 
         elif event_type == 'status':
-            status_detail = event.get('status_detail', '')
-            return 'commit' in status_detail.lower()  # Analizza commit con AI
+            if payload_lower is None:
+                payload_lower = event.get('status_detail', '').lower()
+            return 'commit' in payload_lower  # Analizza commit con AI
 
         return False
 
-    def _contains_complex_patterns(self, code: str) -> bool:
+    def _contains_complex_patterns(self, code: str, code_lower: Optional[str] = None) -> bool:
         """Controlla se codice contiene pattern complessi che meritano AI analysis."""
-        complex_patterns = [
-            'import ', 'def ', 'class ', 'try:', 'except:',
-            'sql', 'query', 'execute', 'connect',
-            'password', 'secret', 'key', 'token',
-            'eval(', 'exec(', 'subprocess', 'os.system'
-        ]
-        return any(pattern in code.lower() for pattern in complex_patterns)
+        if code_lower is None:
+            code_lower = code.lower()
+        return _COMPLEX_KEYWORDS_RE.search(code_lower) is not None
 
-    def _analyze_tool_event(self, event: Dict) -> Optional[AuditResult]:
+    def _analyze_tool_event(self, event: Dict, payload_lower: Optional[str] = None) -> Optional[AuditResult]:
         """Analizza un evento tool (es. Bash, FileEdit)."""
         tool_name = event.get('tool_name', '')
         tool_input = event.get('tool_input', {})
 
         # Analisi specifica per tool
         if tool_name == 'Bash':
-            return self._analyze_bash_command(tool_input)
+            return self._analyze_bash_command(tool_input, payload_lower)
         elif tool_name == 'FileEdit':
-            return self._analyze_file_edit(tool_input)
+            return self._analyze_file_edit(tool_input, payload_lower)
         elif tool_name == 'RunTerminalCmd':
             return self._analyze_terminal_command(tool_input)
 
         return None
 
-    def _analyze_bash_command(self, tool_input: Dict) -> Optional[AuditResult]:
+    def _analyze_bash_command(self, tool_input: Dict, command_lower: Optional[str] = None) -> Optional[AuditResult]:
         """Analizza un comando bash."""
         command = tool_input.get('command', '')
+        if command_lower is None:
+            command_lower = command.lower()
 
-        # Controlli di sicurezza per comandi bash
-        dangerous_patterns = [
-            (r'rm\s+-rf\s+/', 'dangerous_rm', 'high', 'block'),
-            (r'>/dev/null', 'redirect_dev_null', 'medium', 'warn'),
-            (r'chmod\s+777', 'excessive_permissions', 'medium', 'warn'),
-            (r'curl.*\|.*bash', 'pipe_to_bash', 'high', 'block'),
-            (r'wget.*\|.*sh', 'pipe_to_sh', 'high', 'block'),
-        ]
-
-        for pattern, rule_name, severity, action in dangerous_patterns:
-            if re.search(pattern, command, re.IGNORECASE):
-                return AuditResult(
-                    rule_name=rule_name,
-                    severity=severity,
-                    action=action,
-                    description=f"Comando potenzialmente pericoloso rilevato: {pattern}",
-                    evidence=command[:100] + "..." if len(command) > 100 else command,
-                    suggestion=self._get_command_suggestion(rule_name)
-                )
-
-        return None
+        # Controlli di sicurezza per comandi bash: un passaggio sull'alternanza di tutti i pattern
+        if _BASH_SCANNER is not None:
+            idx = _first_match_index(_BASH_SCANNER, _BASH_COMPILED, command_lower)
+        else:
+            idx = next((i for i, compiled in enumerate(_BASH_COMPILED) if compiled.search(command_lower)), None)
+        if idx is None:
+            return None
 
-    def _analyze_file_edit(self, tool_input: Dict) -> Optional[AuditResult]:
+        compiled, rule_name, severity, action = _BASH_PATTERNS[idx]
+        return AuditResult(
+            rule_name=rule_name,
+            severity=severity,
+            action=action,
+            description=f"Comando potenzialmente pericoloso rilevato: {compiled.pattern}",
+            evidence=clip_text(command, 100),
+            suggestion=self._get_command_suggestion(rule_name)
+        )
+
+    def _analyze_file_edit(self, tool_input: Dict, code_lower: Optional[str] = None) -> Optional[AuditResult]:
         """Analizza una modifica file."""
         file_path = tool_input.get('file_path', '')
         old_string = tool_input.get('old_string', '')
         new_string = tool_input.get('new_string', '')
+        if code_lower is None:
+            code_lower = new_string.lower()
 
-        # Controlli di sicurezza sul contenuto
-        issues = []
-
-        # Controllo hardcoded secrets
-        # Limitazione intenzionale: il gate Git non deve "autobloccarsi" su regex/pattern nel codice stesso.
-        # Il pattern rileva assegnazioni o key/value reali, non semplici occorrenze testuali (es. definizioni di regex).
-        secrets_pattern = r"""(?ix)
-        \b(?:
-            api_key|apikey|secret|token|password|access_key|private_key
-        )\b
-        \s*(?:=|:)\s*
-        ['"][^'"\n]{10,}['"]
-        """
-        if re.search(secrets_pattern, new_string):
-            issues.append(('hardcoded_secrets', 'high', 'block'))
+        # Controlli di sicurezza sul contenuto, in ordine di priorità: si riporta solo il primo
+        # issue, quindi i controlli successivi non vanno eseguiti.
+        issue = None
+
+        # Controllo hardcoded secrets (vedi _SECRETS_RE)
+        if any(literal in code_lower for literal in _SECRETS_LITERALS) and _SECRETS_RE.search(code_lower):
+            issue = ('hardcoded_secrets', 'high', 'block')
 
         # Controllo funzioni troppo lunghe
-        if self._is_long_function(new_string):
-            issues.append(('large_function', 'medium', 'warn'))
+        elif self._is_long_function(new_string):
+            issue = ('large_function', 'medium', 'warn')
 
         # Controllo SQL injection patterns
-        sql_patterns = [r'execute\(.*\+.*\)', r'cursor\.execute\(.*%.*\)']
-        for pattern in sql_patterns:
-            if re.search(pattern, new_string):
-                issues.append(('sql_injection_risk', 'high', 'block'))
+        elif _SQL_LITERAL in new_string and _SQL_RE.search(new_string):
+            issue = ('sql_injection_risk', 'high', 'block')
 
-        if issues:
-            rule_name, severity, action = issues[0]  # Prendi il primo issue
+        if issue:
+            rule_name, severity, action = issue
             return AuditResult(
                 rule_name=rule_name,
                 severity=severity,
                 action=action,
                 description=f"Problema rilevato nella modifica del file {file_path}",
                 location=file_path,
-                evidence=new_string[:200] + "..." if len(new_string) > 200 else new_string,
+                evidence=clip_text(new_string, 200),
                 suggestion=self._get_file_edit_suggestion(rule_name)
             )
 
@@ -264,15 +573,16 @@ class AuditorEngine:
 
         return None
 
-    def _analyze_status_event(self, event: Dict) -> Optional[AuditResult]:
+    def _analyze_status_event(self, event: Dict, status_lower: Optional[str] = None) -> Optional[AuditResult]:
         """Analizza un evento di status."""
-        status_detail = event.get('status_detail', '')
+        if status_lower is None:
+            status_lower = event.get('status_detail', '').lower()
 
         # Controllo commit senza test
-        if 'commit' in status_detail.lower():
+        if 'commit' in status_lower:
             # Qui potremmo controllare se ci sono test modificati
             # Per ora, semplice controllo presenza "test" nel messaggio
-            if 'test' not in status_detail.lower():
+            if 'test' not in status_lower:
                 return AuditResult(
                     rule_name='commit_without_tests',
                     severity='low',
@@ -283,37 +593,49 @@ class AuditorEngine:
 
         return None
 
-    def _analyze_message_event(self, event: Dict) -> Optional[AuditResult]:
+    def _analyze_message_event(self, event: Dict, payload_lower: Optional[str] = None) -> Optional[AuditResult]:
         """Analizza un evento messaggio."""
         # Per ora, analisi minima sui messaggi
         return None
 
-    def _analyze_lifecycle_event(self, event: Dict) -> Optional[AuditResult]:
+    def _analyze_lifecycle_event(self, event: Dict, payload_lower: Optional[str] = None) -> Optional[AuditResult]:
         """Analizza un evento lifecycle."""
         # Controllo sessioni troppo lunghe o comportamenti anomali
         return None
 
     def _analyze_generic_event(self, event: Dict) -> Optional[AuditResult]:
         """Analisi generica per eventi non specifici."""
-        # Controllo pattern generici di sicurezza
+        # Senza regole a pattern non serve serializzare l'evento.
+        if not self._has_pattern_rules:
+            return None
+
+        # Controllo pattern generici di sicurezza.
+        # Le regole matchano sulla forma JSON (es. chiave + valore tra apici): scansionare i soli
+        # valori stringa cambierebbe i risultati, quindi la serializzazione resta.
         event_json = json.dumps(event)
 
-        for rule in self.rules:
-            if rule.pattern and re.search(rule.pattern, event_json, re.IGNORECASE):
-                return AuditResult(
-                    rule_name=rule.name,
-                    severity=rule.severity,
-                    action=rule.action,
-                    description=rule.description,
-                    evidence=event_json[:200] + "..." if len(event_json) > 200 else event_json
-                )
+        if self._rules_scanner is not None:
+            # Un solo passaggio sul JSON per tutte le regole
+            idx = _first_match_index(self._rules_scanner, self._rule_patterns, event_json)
+        else:
+            idx = next((i for i, compiled in enumerate(self._rule_patterns)
+                        if compiled and compiled.search(event_json)), None)
+        if idx is None:
+            return None
 
-        return None
+        rule = self.rules[idx]
+        return AuditResult(
+            rule_name=rule.name,
+            severity=rule.severity,
+            action=rule.action,
+            description=rule.description,
+            evidence=clip_text(event_json, 200)
+        )
 
     def _is_long_function(self, code: str) -> bool:
         """Controlla se il codice contiene funzioni troppo lunghe."""
-        # Semplice euristica: conta le linee
-        lines = len(code.split('\n'))
+        # Semplice euristica: conta le linee (newline + 1, senza allocare la lista di split)
+        lines = code.count('\n') + 1
         return lines > 50  # Configurabile
 
     def _get_command_suggestion(self, rule_name: str) -> str:
@@ -338,7 +660,8 @@ class AuditorEngine:
 
     def _load_rules(self) -> List[AuditRule]:
         """Carica le regole di auditing dalla configurazione."""
-        if yaml is None:
+        yaml_load = _yaml_safe_load()
+        if yaml_load is None:
             print("⚠️  pyyaml non installato: uso regole di default (audit_rules.yaml non caricato)")
             return self._get_default_rules()
 
@@ -348,15 +671,26 @@ class AuditorEngine:
             return self._get_default_rules()
 
         try:
-            with open(rules_file, 'r', encoding='utf-8') as f:
-                rules_data = yaml.safe_load(f)
-
-            rules = []
-            for category, category_rules in rules_data.items():
-                for rule_data in category_rules:
-                    rules.append(AuditRule(**rule_data))
-
-            return rules
+            st = rules_file.stat()
+            cache_key = (str(rules_file.resolve()), st.st_mtime_ns, st.st_size)
+            rules = _RULES_CACHE.get(cache_key)
+            if rules is None:
+                with open(rules_file, 'r', encoding='utf-8') as f:
+                    rules_data = yaml_load(f)
+
+                loaded = []
+                for category, category_rules in rules_data.items():
+                    for rule_data in category_rules:
+                        # Un pattern non valido scarta solo la sua regola, non l'intero file.
+                        try:
+                            loaded.append(AuditRule(**rule_data))
+                        except re.error as e:
+                            print(f"⚠️  Regola '{rule_data.get('name', '?')}' ({category}) ignorata: pattern non valido: {e}")
+                rules = tuple(loaded)
+                _RULES_CACHE[cache_key] = rules
+
+            # Lista nuova per engine: self.rules resta modificabile senza toccare la cache.
+            return list(rules)
 
         except Exception as e:
             print(f"⚠️  Errore caricamento regole: {e}")
@@ -384,16 +718,16 @@ class AuditorEngine:
     def _print_stats(self):
         """Stampa le statistiche finali."""
         print("\n📊 Statistiche Auditor Engine:")
-        print(f"   Eventi processati: {self.stats['events_processed']}")
-        print(f"   Problemi rilevati: {self.stats['issues_found']}")
-        print(f"   Avvisi inviati: {self.stats['warnings_sent']}")
-        print(f"   Blocchi applicati: {self.stats['blocks_applied']}")
+        print(f"   Eventi processati: {self._stats.events_processed}")
+        print(f"   Problemi rilevati: {self._stats.issues_found}")
+        print(f"   Avvisi inviati: {self._stats.warnings_sent}")
+        print(f"   Blocchi applicati: {self._stats.blocks_applied}")
 
     def update_stats(self, result: AuditResult):
         """Aggiorna le statistiche dopo un risultato."""
-        self.stats['issues_found'] += 1
+        self._stats.issues_found += 1
 
         if result.action == 'warn':
-            self.stats['warnings_sent'] += 1
+            self._stats.warnings_sent += 1
         elif result.action == 'block':
-            self.stats['blocks_applied'] += 1
+            self._stats.blocks_applied += 1
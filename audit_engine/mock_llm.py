@@ -5,11 +5,29 @@ Simula risposte AI basate su pattern predefiniti.
 
 import re
 import json
+import functools
 from typing import Dict, Optional, Any
 from dataclasses import dataclass
-
-
-@dataclass
+from .models.audit_result import DATACLASS_SLOTS, clip_text
+
+
+# Keyword per categoria, in ordine di priorità: vince la categoria con priorità più alta presente nel prompt.
+_PROMPT_CATEGORIES = [
+    ('hardcoded_secret', ['secret', 'password', 'api_key']),
+    ('dangerous_command', ['rm -rf', 'dangerous', 'command']),
+    ('security_analysis', ['security', 'vulnerability', 'risk']),
+    ('code_quality', ['quality', 'maintainability', 'complexity']),
+]
+_PROMPT_KEYWORD_PRIORITY = {
+    keyword: priority
+    for priority, (_category, keywords) in enumerate(_PROMPT_CATEGORIES)
+    for keyword in keywords
+}
+# Lookahead: match a larghezza zero, così keyword sovrapposte non si nascondono a vicenda.
+_PROMPT_KEYWORDS_RE = re.compile('(?=(' + '|'.join(map(re.escape, _PROMPT_KEYWORD_PRIORITY)) + '))')
+
+
+@dataclass(**DATACLASS_SLOTS)
 class MockLLMResponse:
     """Risposta simulata da LLM."""
     content: str
@@ -119,22 +137,22 @@ class MockLLM:
             tokens_used=len(response_content.split())
         )
 
-    def _classify_prompt(self, prompt: str) -> str:
-        """Classifica il prompt per determinare il tipo di risposta."""
-        prompt_lower = prompt.lower()
-
-        if 'secret' in prompt_lower or 'password' in prompt_lower or 'api_key' in prompt_lower:
-            return 'hardcoded_secret'
-
-        if 'rm -rf' in prompt_lower or 'dangerous' in prompt_lower or 'command' in prompt_lower:
-            return 'dangerous_command'
-
-        if 'security' in prompt_lower or 'vulnerability' in prompt_lower or 'risk' in prompt_lower:
-            return 'security_analysis'
-
-        if 'quality' in prompt_lower or 'maintainability' in prompt_lower or 'complexity' in prompt_lower:
-            return 'code_quality'
+    @staticmethod
+    @functools.lru_cache(maxsize=1024)
+    def _classify_prompt(prompt: str) -> str:
+        """
+        Classifica il prompt per determinare il tipo di risposta.
 
+        Funzione pura: memoizzata per prompt, i test ripetono spesso gli stessi prompt.
+        """
+        best = len(_PROMPT_CATEGORIES)
+        for match in _PROMPT_KEYWORDS_RE.finditer(prompt.lower()):
+            best = min(best, _PROMPT_KEYWORD_PRIORITY[match.group(1)])
+            if best == 0:
+                break
+
+        if best < len(_PROMPT_CATEGORIES):
+            return _PROMPT_CATEGORIES[best][0]
         return 'security_analysis'  # Default
 
     def _get_fallback_response(self) -> str:
@@ -152,8 +170,8 @@ class MockLLM:
         """Restituisce statistiche delle chiamate mock."""
         return {
             'call_count': self.call_count,
-            'last_prompt': self.last_prompt[:200] + "..." if len(self.last_prompt) > 200 else self.last_prompt,
-            'last_response': self.last_response[:200] + "..." if len(self.last_response) > 200 else self.last_response
+            'last_prompt': clip_text(self.last_prompt, 200),
+            'last_response': clip_text(self.last_response, 200)
         }
 
     def reset_stats(self):
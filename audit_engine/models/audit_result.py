@@ -3,11 +3,23 @@ Modelli di dati per i risultati dell'auditing.
 Separati per evitare import circolari.
 """
 
+import sys
 from dataclasses import dataclass
 from typing import Optional
 
 
-@dataclass
+# slots=True elimina il __dict__ per istanza; disponibile solo da Python 3.10 (il progetto supporta 3.8+).
+DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+def clip_text(text: str, limit: int, suffix: str = "...") -> str:
+    """Tronca il testo a limit caratteri (più suffix); i testi già corti sono restituiti senza copia."""
+    if len(text) <= limit:
+        return text
+    return text[:limit] + suffix
+
+
+@dataclass(**DATACLASS_SLOTS)
 class AuditResult:
     """Risultato di un'analisi di audit."""
     rule_name: str
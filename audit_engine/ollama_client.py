@@ -4,13 +4,100 @@ Permette analisi AI reale invece di mock responses.
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+import os
+import re
 import json
 import time
-from typing import Dict, Optional, Any, List
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Any, List, Tuple, Iterator
 from dataclasses import dataclass
+from .models.audit_result import DATACLASS_SLOTS
+try:
+    import orjson  # type: ignore
+except ModuleNotFoundError:  # pragma: no cover
+    orjson = None
 
 
-@dataclass
+_JSON_HEADERS = {'Content-Type': 'application/json'}
+
+# Validità della lista modelli di /api/tags: cambia di rado, get_stats la interroga a ogni chiamata.
+_TAGS_TTL_SECONDS = 30.0
+
+# Intestazione di sezione attesa nella risposta batch: "### ANALISI <n> ###"
+_BATCH_SECTION_RE = re.compile(r'^\s*#{3}\s*ANALISI\s+(\d+)\s*#{3}\s*$', re.MULTILINE | re.IGNORECASE)
+
+# Scheletri statici dei prompt: costruiti una volta, per chiamata si concatena solo la parte variabile.
+_CODE_ANALYSIS_PREFIX = "Analizza questo frammento di codice per problemi di sicurezza, qualità e best practices:\n\n"
+_CODE_ANALYSIS_SUFFIX = """
+
+Fornisci un'analisi dettagliata che includa:
+1. Livello di rischio (LOW/MEDIUM/HIGH/CRITICAL)
+2. Problemi specifici identificati
+3. Suggerimenti per miglioramento
+4. Eventuali vulnerabilità di sicurezza
+
+Rispondi in italiano se possibile, ma mantieni termini tecnici in inglese quando appropriato."""
+
+_COMMIT_ANALYSIS_PREFIX = "Analizza questo commit per qualità, completezza e aderenza alle best practices:\n\nMessaggio commit: "
+_COMMIT_ANALYSIS_MIDDLE = "\n\nCambimenti:\n"
+_COMMIT_ANALYSIS_SUFFIX = """
+
+Valuta:
+1. Chiarezza e completezza del messaggio
+2. Atomicità dei cambiamenti
+3. Presenza di test se applicabile
+4. Qualità del codice modificato
+
+Fornisci un feedback costruttivo."""
+
+
+def _json_loads(data: bytes) -> Any:
+    """Decodifica JSON dai byte della risposta: orjson se installato (parser C), altrimenti stdlib.
+
+    orjson.JSONDecodeError è sottoclasse di json.JSONDecodeError: la gestione errori resta la stessa.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _json_dumps(obj: Any) -> bytes:
+    """Serializza il corpo delle richieste in JSON compatto UTF-8 (orjson se installato).
+
+    Rispetto a requests(json=...) niente spazi dopo i separatori né escape \\uXXXX per i
+    caratteri non ASCII: il prompt (codice + testo italiano) viaggia con meno byte.
+    Stringhe con surrogati isolati (non codificabili in UTF-8) ripiegano sulla forma con escape ASCII.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj)
+        except TypeError:  # orjson.JSONEncodeError
+            return json.dumps(obj, separators=(",", ":")).encode("ascii")
+    try:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    except UnicodeEncodeError:
+        return json.dumps(obj, separators=(",", ":")).encode("ascii")
+
+
+def _message_content(data: Dict[str, Any]) -> str:
+    """Testo di una risposta/chunk di /api/chat, senza allocare un dict vuoto quando manca "message"."""
+    message = data.get('message')
+    return message.get('content', '') if message else ''
+
+
+def _context_block(context: Optional[Dict[str, Any]]) -> str:
+    """Blocco "Contesto" del prompt; stringa vuota (nessuna serializzazione) senza contesto."""
+    if not context:
+        return ""
+    return "\nContesto: " + json.dumps(context, indent=2)
+
+
+@dataclass(**DATACLASS_SLOTS)
 class OllamaResponse:
     """Risposta da Ollama API."""
     content: str
@@ -23,78 +110,159 @@ class OllamaResponse:
 class OllamaClient:
     """Client per comunicare con Ollama API."""
 
-    def __init__(self, base_url: str = "http://localhost:11434", model: str = "codegeex", timeout_seconds: int = 30):
+    def __init__(self, base_url: str = "http://localhost:11434", model: str = "codegeex", timeout_seconds: int = 30,
+                 cache_size: int = 1024, cache_dir: Optional[str] = None, stream: bool = False,
+                 connect_timeout: float = 3.0):
         """Inizializza client Ollama.
 
         Args:
             base_url: URL base dell'API Ollama (default: localhost:11434)
             model: Nome del modello da usare (default: codegeex)
-            timeout_seconds: Timeout HTTP per /api/chat (include cold start e generation)
+            timeout_seconds: Timeout di lettura per /api/chat (include cold start e generation)
+            cache_size: Risposte di analyze_code/analyze_commit tenute in memoria (0 = cache disattivata)
+            cache_dir: Directory per la persistenza su disco delle risposte (None = solo memoria)
+            stream: Default di analyze_code: riceve la generazione in streaming (timeout per chunk + scadenza totale)
+            connect_timeout: Timeout di connessione TCP: un server irraggiungibile fallisce subito
+                invece di attendere l'intero timeout di lettura
         """
         self.base_url = base_url.rstrip('/')
         self.model = model
         self.timeout = int(timeout_seconds)  # secondi
+        self.connect_timeout = float(connect_timeout)
+        self.stream = bool(stream)
+
+        # Cache esatta prompt -> risposta: un hit evita l'intera chiamata LLM.
+        self.cache_size = int(cache_size)
+        self.cache_dir = Path(cache_dir).expanduser() if cache_dir else None
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._response_cache: "OrderedDict[str, str]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+        # Lista modelli (/api/tags) condivisa da test_connection e get_available_models: (istante, nomi).
+        self._tags_cache: Optional[Tuple[float, List[str]]] = None
+
+        # Sessione persistente: riusa la connessione TCP (keep-alive) tra chiamate successive.
+        # max_retries=0: una chiamata LLM non è idempotente in costo, il retry resta al chiamante.
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=10, pool_maxsize=10, max_retries=0)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({
+            'Connection': 'keep-alive',
+            'Accept-Encoding': 'gzip, deflate',
+            'User-Agent': 'auditor-ollama/1.0',
+        })
+
+    def close(self):
+        """Rilascia le connessioni del pool HTTP."""
+        self.session.close()
+
+    def __enter__(self) -> "OllamaClient":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _get_model_names(self, force: bool = False) -> List[str]:
+        """
+        Nomi dei modelli da /api/tags, riusati per _TAGS_TTL_SECONDS (force=True rilegge subito).
+        Solleva RequestException (HTTPError per status != 200); gli errori non vanno in cache.
+        """
+        cached = self._tags_cache
+        if not force and cached is not None and time.monotonic() - cached[0] < _TAGS_TTL_SECONDS:
+            return cached[1]
+
+        response = self.session.get(f"{self.base_url}/api/tags", timeout=(self.connect_timeout, 5))
+        if response.status_code != 200:
+            raise requests.exceptions.HTTPError(f"HTTP {response.status_code}", response=response)
+        model_names = [m['name'] for m in response.json().get('models', [])]
+        self._tags_cache = (time.monotonic(), model_names)
+        return model_names
+
+    def refresh_models(self) -> List[str]:
+        """Rilegge la lista modelli ignorando la cache (es. dopo un pull)."""
+        return list(self._get_model_names(force=True))
 
     def test_connection(self) -> bool:
         """Test connessione a Ollama."""
         try:
-            response = requests.get(f"{self.base_url}/api/tags", timeout=5)
-            if response.status_code == 200:
-                models = response.json().get('models', [])
-                model_names = [m['name'] for m in models]
-                print(f"✅ Connesso a Ollama. Modelli disponibili: {model_names}")
-
-                if self.model not in model_names:
-                    print(f"⚠️  Modello '{self.model}' non trovato. Disponibili: {model_names}")
-                    return False
-
-                return True
-            else:
-                print(f"❌ Errore connessione Ollama: HTTP {response.status_code}")
-                return False
-
+            model_names = self._get_model_names()
         except requests.exceptions.RequestException as e:
             print(f"❌ Errore connessione Ollama: {e}")
             return False
 
-    def chat_completion(self, messages: List[Dict[str, str]],
-                       temperature: float = 0.1,
-                       max_tokens: int = 1000) -> Optional[OllamaResponse]:
-        """Invia richiesta chat completion a Ollama."""
+        print(f"✅ Connesso a Ollama. Modelli disponibili: {model_names}")
+        if self.model not in model_names:
+            print(f"⚠️  Modello '{self.model}' non trovato. Disponibili: {model_names}")
+            return False
 
-        payload = {
+        return True
+
+    def _chat_payload(self, messages: List[Dict[str, str]], temperature: float, max_tokens: int,
+                      stream: bool) -> Dict[str, Any]:
+        return {
             "model": self.model,
             "messages": messages,
-            "stream": False,
+            "stream": stream,
             "options": {
                 "temperature": temperature,
                 "num_predict": max_tokens
             }
         }
 
+    def _post_json(self, path: str, payload: Dict[str, Any], **kwargs: Any) -> requests.Response:
+        """POST di un corpo JSON già serializzato da _json_dumps."""
         try:
-            start_time = time.time()
-            response = requests.post(
-                f"{self.base_url}/api/chat",
-                json=payload,
-                timeout=self.timeout
-            )
+            body = _json_dumps(payload)
+        except (TypeError, ValueError) as e:
+            # Stesso contratto di requests(json=...): errore di richiesta, gestito dai chiamanti.
+            raise requests.exceptions.InvalidJSONError(e) from e
+        return self.session.post(f"{self.base_url}{path}", data=body, headers=_JSON_HEADERS, **kwargs)
 
-            if response.status_code == 200:
-                data = response.json()
-                end_time = time.time()
-
-                return OllamaResponse(
-                    content=data.get('message', {}).get('content', ''),
-                    tokens_used=data.get('eval_count', 0),
-                    model=data.get('model', self.model),
-                    total_duration=end_time - start_time,
-                    eval_duration=data.get('eval_duration', 0) / 1e9  # Converti nanosecondi a secondi
-                )
+    def chat_completion(self, messages: List[Dict[str, str]],
+                       temperature: float = 0.1,
+                       max_tokens: int = 1000,
+                       stream: bool = False) -> Optional[OllamaResponse]:
+        """
+        Invia richiesta chat completion a Ollama.
+
+        Con stream=True la risposta è ricevuta a chunk NDJSON e riassemblata: il timeout vale
+        per singola lettura e la scadenza totale (self.timeout) interrompe subito la generazione.
+        """
+
+        payload = self._chat_payload(messages, temperature, max_tokens, stream)
+
+        try:
+            start_time = time.time()
+            if stream:
+                pieces = []
+                data: Dict[str, Any] = {}
+                for data in self._stream_chunks(payload):
+                    pieces.append(_message_content(data))
+                content = "".join(pieces)
             else:
-                print(f"❌ Errore Ollama API: HTTP {response.status_code} - {response.text}")
-                return None
+                response = self._post_json("/api/chat", payload, timeout=(self.connect_timeout, self.timeout))
+
+                if response.status_code != 200:
+                    print(f"❌ Errore Ollama API: HTTP {response.status_code} - {response.text}")
+                    return None
+
+                data = _json_loads(response.content)
+                content = _message_content(data)
+
+            end_time = time.time()
+            return OllamaResponse(
+                content=content,
+                tokens_used=data.get('eval_count', 0),
+                model=data.get('model', self.model),
+                total_duration=end_time - start_time,
+                eval_duration=data.get('eval_duration', 0) / 1e9  # Converti nanosecondi a secondi
+            )
 
+        except requests.exceptions.ConnectTimeout:
+            print(f"❌ Ollama non raggiungibile (connessione oltre {self.connect_timeout}s)")
+            return None
         except requests.exceptions.Timeout:
             print(f"❌ Timeout Ollama ({self.timeout}s)")
             return None
@@ -105,67 +273,186 @@ class OllamaClient:
             print("❌ Errore parsing risposta JSON da Ollama")
             return None
 
-    def analyze_code(self, code: str, context: Dict[str, Any] = None) -> Optional[str]:
-        """Analizza codice con LLM per problemi di sicurezza/qualità."""
+    def chat_completion_stream(self, messages: List[Dict[str, str]],
+                               temperature: float = 0.1,
+                               max_tokens: int = 1000) -> Iterator[str]:
+        """Come chat_completion, ma restituisce i frammenti di testo man mano che Ollama li genera."""
+        try:
+            for chunk in self._stream_chunks(self._chat_payload(messages, temperature, max_tokens, True)):
+                piece = _message_content(chunk)
+                if piece:
+                    yield piece
+        except requests.exceptions.ConnectTimeout:
+            print(f"❌ Ollama non raggiungibile (connessione oltre {self.connect_timeout}s)")
+        except requests.exceptions.Timeout:
+            print(f"❌ Timeout Ollama ({self.timeout}s)")
+        except requests.exceptions.RequestException as e:
+            print(f"❌ Errore richiesta Ollama: {e}")
+        except json.JSONDecodeError:
+            print("❌ Errore parsing risposta JSON da Ollama")
+
+    def _stream_chunks(self, payload: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """Itera i chunk NDJSON di /api/chat in streaming, fino a "done" o alla scadenza totale."""
+        deadline = time.monotonic() + self.timeout
+        with self._post_json("/api/chat", payload, timeout=(self.connect_timeout, self.timeout),
+                             stream=True) as response:
+            if response.status_code != 200:
+                raise requests.exceptions.HTTPError(f"HTTP {response.status_code} - {response.text}",
+                                                    response=response)
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                chunk = _json_loads(line)
+                yield chunk
+                if chunk.get('done'):
+                    return
+                if time.monotonic() > deadline:
+                    raise requests.exceptions.Timeout(f"generazione oltre {self.timeout}s")
+
+    def analyze_code(self, code: str, context: Optional[Dict[str, Any]] = None,
+                     stream: Optional[bool] = None) -> Optional[str]:
+        """
+        Analizza codice con LLM per problemi di sicurezza/qualità.
 
-        context_str = ""
-        if context:
-            context_str = f"\nContesto: {json.dumps(context, indent=2)}"
+        stream: usa /api/chat in streaming (None = default del client).
+        """
 
-        prompt = f"""Analizza questo frammento di codice per problemi di sicurezza, qualità e best practices:
+        prompt = "".join((_CODE_ANALYSIS_PREFIX, code, _context_block(context), _CODE_ANALYSIS_SUFFIX))
+        return self._cached_completion(prompt, temperature=0.1, max_tokens=800,
+                                       stream=self.stream if stream is None else stream)
 
-{code}{context_str}
+    def analyze_code_batch(self, snippets: List[Tuple[str, Optional[Dict[str, Any]]]]) -> Optional[List[Optional[str]]]:
+        """
+        Analizza più frammenti di codice con una sola richiesta /api/chat.
 
-Fornisci un'analisi dettagliata che includa:
+        Ogni frammento è delimitato da un'intestazione numerata e la risposta viene
+        suddivisa per numero di sezione. Restituisce un'analisi per frammento, nello
+        stesso ordine (None per i frammenti la cui sezione manca nella risposta),
+        oppure None se la richiesta stessa fallisce.
+        """
+        if len(snippets) <= 1:
+            return [self.analyze_code(code, context) for code, context in snippets]
+
+        blocks = []
+        for idx, (code, context) in enumerate(snippets, 1):
+            blocks.append(f"### FRAMMENTO {idx} ###\n{code}{_context_block(context)}")
+        joined_blocks = "\n\n".join(blocks)
+
+        prompt = f"""Analizza i seguenti {len(snippets)} frammenti di codice per problemi di sicurezza, qualità e best practices.
+Ogni frammento inizia con una riga "### FRAMMENTO <n> ###".
+
+{joined_blocks}
+
+Per OGNI frammento fornisci un'analisi dettagliata che includa:
 1. Livello di rischio (LOW/MEDIUM/HIGH/CRITICAL)
 2. Problemi specifici identificati
 3. Suggerimenti per miglioramento
 4. Eventuali vulnerabilità di sicurezza
 
+Inizia l'analisi di ciascun frammento con la riga "### ANALISI <n> ###" (stesso numero del frammento).
 Rispondi in italiano se possibile, ma mantieni termini tecnici in inglese quando appropriato."""
 
         messages = [{"role": "user", "content": prompt}]
 
-        response = self.chat_completion(messages, temperature=0.1, max_tokens=800)
+        response = self.chat_completion(messages, temperature=0.1, max_tokens=800 * len(snippets))
+        if not response:
+            return None
+
+        return self._split_batch_response(response.content, len(snippets))
 
-        if response:
-            return response.content
-        return None
+    @staticmethod
+    def _split_batch_response(content: str, count: int) -> List[Optional[str]]:
+        """Suddivide la risposta batch nelle sezioni "### ANALISI <n> ###"."""
+        sections: Dict[int, str] = {}
+        headers = list(_BATCH_SECTION_RE.finditer(content))
+        for pos, header in enumerate(headers):
+            end = headers[pos + 1].start() if pos + 1 < len(headers) else len(content)
+            text = content[header.end():end].strip()
+            if text:
+                sections.setdefault(int(header.group(1)), text)
+        return [sections.get(idx) for idx in range(1, count + 1)]
 
     def analyze_commit(self, commit_message: str, changes: str) -> Optional[str]:
         """Analizza un commit per qualità e completezza."""
 
-        prompt = f"""Analizza questo commit per qualità, completezza e aderenza alle best practices:
-
-Messaggio commit: {commit_message}
-
-Cambimenti:
-{changes}
-
-Valuta:
-1. Chiarezza e completezza del messaggio
-2. Atomicità dei cambiamenti
-3. Presenza di test se applicabile
-4. Qualità del codice modificato
-
-Fornisci un feedback costruttivo."""
-
-        messages = [{"role": "user", "content": prompt}]
-
-        response = self.chat_completion(messages, temperature=0.2, max_tokens=600)
+        prompt = "".join((_COMMIT_ANALYSIS_PREFIX, commit_message, _COMMIT_ANALYSIS_MIDDLE, changes,
+                          _COMMIT_ANALYSIS_SUFFIX))
+        return self._cached_completion(prompt, temperature=0.2, max_tokens=600)
+
+    def _cached_completion(self, prompt: str, temperature: float, max_tokens: int,
+                           stream: bool = False) -> Optional[str]:
+        """Chat completion con cache per (modello, parametri, prompt): memoria LRU, poi disco se configurato."""
+        if self.cache_size <= 0:
+            response = self.chat_completion([{"role": "user", "content": prompt}],
+                                            temperature=temperature, max_tokens=max_tokens, stream=stream)
+            return response.content if response else None
+
+        key = hashlib.blake2b(
+            f"{self.model}|{temperature}|{max_tokens}|{prompt}".encode('utf-8', 'surrogatepass'),
+            digest_size=16,
+        ).hexdigest()
+
+        with self._cache_lock:
+            content = self._response_cache.get(key)
+            if content is not None:
+                self._response_cache.move_to_end(key)
+                self.cache_hits += 1
+                return content
+
+        content = self._read_cached_response(key)
+        if content is None:
+            with self._cache_lock:
+                self.cache_misses += 1
+            response = self.chat_completion([{"role": "user", "content": prompt}],
+                                            temperature=temperature, max_tokens=max_tokens, stream=stream)
+            if not response:
+                return None
+            content = response.content
+            self._write_cached_response(key, content)
+        else:
+            with self._cache_lock:
+                self.cache_hits += 1
+
+        with self._cache_lock:
+            self._response_cache[key] = content
+            self._response_cache.move_to_end(key)
+            while len(self._response_cache) > self.cache_size:
+                self._response_cache.popitem(last=False)
+        return content
+
+    def _read_cached_response(self, key: str) -> Optional[str]:
+        """Legge una risposta dalla cache su disco (None se assente o disco non configurato)."""
+        if self.cache_dir is None:
+            return None
+        try:
+            return (self.cache_dir / f"{key}.txt").read_text(encoding='utf-8')
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            print(f"⚠️  Cache Ollama non leggibile ({self.cache_dir}): {e}")
+            return None
 
-        if response:
-            return response.content
-        return None
+    def _write_cached_response(self, key: str, content: str):
+        """Scrive una risposta su disco in modo atomico (file temporaneo + rename)."""
+        if self.cache_dir is None:
+            return
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    f.write(content)
+                os.replace(tmp_path, self.cache_dir / f"{key}.txt")
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except OSError as e:
+            print(f"⚠️  Cache Ollama non scrivibile ({self.cache_dir}): {e}")
 
     def get_available_models(self) -> List[str]:
         """Restituisce lista modelli disponibili."""
         try:
-            response = requests.get(f"{self.base_url}/api/tags", timeout=5)
-            if response.status_code == 200:
-                models = response.json().get('models', [])
-                return [m['name'] for m in models]
-            return []
+            return list(self._get_model_names())
         except Exception:
             return []
 
@@ -174,10 +461,10 @@ Fornisci un feedback costruttivo."""
         model = model_name or self.model
 
         try:
-            response = requests.post(
+            response = self.session.post(
                 f"{self.base_url}/api/show",
                 json={"name": model},
-                timeout=10
+                timeout=(self.connect_timeout, 10)
             )
 
             if response.status_code == 200:
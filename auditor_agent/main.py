@@ -5,8 +5,8 @@ Main entry point per l'agente di auditing che monitora Claude Code in tempo real
 """
 
 import sys
-import time
 import signal
+import threading
 import argparse
 from pathlib import Path
 from typing import Optional
@@ -31,6 +31,13 @@ class AuditorAgent:
         self.dashboard = MonitoringDashboard(self.config)
         self.running = False
 
+        # Polling adattivo: 10 ms dopo un evento, raddoppio fino a 1 s a vuoto.
+        # L'attesa avviene su un Event, così stop() sveglia subito il loop.
+        self._min_idle = 0.01
+        self._max_idle = 1.0
+        self._idle_sleep = self._min_idle
+        self._wakeup = threading.Event()
+
     def start(self):
         """Avvia l'agente auditor."""
         print("🚀 Avvio Auditor Agent...")
@@ -48,6 +55,7 @@ class AuditorAgent:
             if self.config.enable_dashboard:
                 self.dashboard.start()
 
+            self._wakeup.clear()
             self.running = True
             print("✅ Auditor Agent attivo e operativo")
 
@@ -65,6 +73,7 @@ class AuditorAgent:
     def stop(self):
         """Ferma l'agente auditor."""
         self.running = False
+        self._wakeup.set()
 
         if self.dashboard:
             self.dashboard.stop()
@@ -85,38 +94,46 @@ class AuditorAgent:
                 events = self.hcom_client.get_new_events()
 
                 if events:
-                    for event in events:
-                        self._process_event(event)
+                    self._process_events(events)
+                    self._idle_sleep = self._min_idle
+                else:
+                    self._idle_sleep = min(self._max_idle, self._idle_sleep * 2)
 
                 # Aggiorna dashboard
                 if self.dashboard:
                     self.dashboard.update()
 
-                # Pausa breve
-                time.sleep(0.1)
+                # Pausa adattiva
+                self._wakeup.wait(self._idle_sleep)
 
             except Exception as e:
                 print(f"⚠️  Errore nel loop principale: {e}")
-                time.sleep(1)
+                self._wakeup.wait(1)
 
     def _process_event(self, event: dict):
         """Elabora un evento ricevuto."""
-        # Filtra per istanza target se configurata.
-        instance = event.get("instance") or event.get("data", {}).get("instance")
-        if self.config.target_instance and instance and instance != self.config.target_instance:
-            return
+        self._process_events([event])
 
-        event_type = event.get('type', 'unknown')
+    def _process_events(self, events: list):
+        """Elabora un batch di eventi: le analisi AI del batch vengono eseguite in parallelo dal motore."""
+        accepted = []
+        for event in events:
+            # Filtra per istanza target se configurata.
+            instance = event.get("instance") or event.get("data", {}).get("instance")
+            if self.config.target_instance and instance and instance != self.config.target_instance:
+                continue
 
-        # Log dell'evento
-        print(f"📥 Evento ricevuto: {event_type}")
+            # Log dell'evento
+            print(f"📥 Evento ricevuto: {event.get('type', 'unknown')}")
+            accepted.append(event)
 
         # Inoltra al motore di auditing
-        audit_result = self.audit_engine.analyze_event(event)
+        audit_results = self.audit_engine.analyze_events(accepted)
 
-        if audit_result:
-            # Gestisci il risultato dell'audit
-            self._handle_audit_result(audit_result, event)
+        for event, audit_result in zip(accepted, audit_results):
+            if audit_result:
+                # Gestisci il risultato dell'audit
+                self._handle_audit_result(audit_result, event)
 
     def _handle_audit_result(self, result: AuditResult, original_event: dict):
         """Gestisce il risultato di un'analisi di audit."""
@@ -9,20 +9,40 @@ AuditorEngine rules.
 
 from __future__ import annotations
 
-import argparse
+import codecs
 import os
 import subprocess
 import sys
+from contextlib import closing
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Iterable, Optional
+from types import SimpleNamespace
+from typing import Iterable, Iterator, Optional
 
 
 REPO_ROOT_ENV = "AUDITOR_REPO_ROOT"
 BOOTSTRAP_MAX_COMMITS_ENV = "AUDITOR_PRE_PUSH_BOOTSTRAP_MAX_COMMITS"
+# Hooks cannot pass gate flags: this env var turns on --fail-fast for hook invocations.
+FAIL_FAST_ENV = "AUDITOR_GATE_FAIL_FAST"
 
+# pre-push uses the all-zero object name for a deleted ref (local) or a new ref (remote).
+ZERO_SHA = "0" * 40
 
-@dataclass(frozen=True)
+# slots=True (no per-instance __dict__) is only available from Python 3.10.
+_DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+# git subprocesses are I/O-bound: threads overlap their fork/exec and output waits.
+GIT_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# Commits whose patches are read by a single `git show` in pre-push.
+PATCH_BATCH_SIZE = 64
+
+DEFAULT_MAX_CHARS_PER_FILE = 200_000
+DEFAULT_MAX_CHARS_PER_COMMIT = 400_000
+
+
+@dataclass(frozen=True, **_DATACLASS_SLOTS)
 class Violation:
     rule_name: str
     severity: str
@@ -42,6 +62,17 @@ def _run_git(args: list[str], *, cwd: Path, check: bool = True) -> subprocess.Co
     )
 
 
+def _decode_git_text(data: bytes) -> str:
+    # Same text view as _run_git (text=True): UTF-8 plus universal newlines.
+    return data.decode("utf-8", errors="replace").replace("\r\n", "\n").replace("\r", "\n")
+
+
+def _utf8_cap(max_chars: int) -> int:
+    # Bytes that always decode to more than max_chars characters (UTF-8: at most 4 bytes per char),
+    # so _limit_text still sees the text as truncated and the kept prefix decodes identically.
+    return max_chars * 4 + 4
+
+
 def _repo_root() -> Path:
     if REPO_ROOT_ENV in os.environ and os.environ[REPO_ROOT_ENV]:
         return Path(os.environ[REPO_ROOT_ENV]).resolve()
@@ -53,13 +84,14 @@ def _repo_root() -> Path:
 
 def _safe_repo_path(repo_root: Path, rel_path: str) -> Optional[Path]:
     """
-    Convert a repo-relative path into an absolute path under repo_root.
+    Convert a repo-relative path into an absolute path under repo_root, which the caller
+    resolves once per run (not once per file).
 
-    Security: reject paths that escape repo_root.
+    Security: reject paths that escape repo_root, symlinks included (hence resolve()).
     """
     try:
         abs_path = (repo_root / rel_path).resolve()
-        abs_path.relative_to(repo_root.resolve())
+        abs_path.relative_to(repo_root)
         return abs_path
     except Exception:
         return None
@@ -70,6 +102,29 @@ def _is_text_file_bytes(buf: bytes) -> bool:
     return b"\x00" not in buf
 
 
+# Leading bytes checked before reading further (git sniffs the first 8000 bytes the same way).
+_BINARY_SNIFF_BYTES = 8192
+
+
+def _read_text_file_capped(path: Path, max_bytes: int) -> Optional[bytes]:
+    """
+    First max_bytes (at least the sniffed head) of a text file, or None if the file contains
+    a NUL byte anywhere. Binaries usually fail on the head, so they are not read in full;
+    past the kept prefix the file is only scanned for NUL in chunks, never accumulated.
+    """
+    with path.open("rb") as f:
+        head = f.read(_BINARY_SNIFF_BYTES)
+        if not _is_text_file_bytes(head):
+            return None
+        data = head + f.read(max(0, max_bytes - len(head)))
+        if not _is_text_file_bytes(data):
+            return None
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            if not _is_text_file_bytes(chunk):
+                return None
+    return data
+
+
 def _load_engine(config_path: Optional[Path]):
     # Local imports: keep gate script usable without installing as a package.
     sys.path.insert(0, str((Path(__file__).parent).resolve()))
@@ -90,29 +145,220 @@ def _load_engine(config_path: Optional[Path]):
     return engine
 
 
-def _staged_paths(repo_root: Path) -> list[str]:
-    cp = _run_git(["diff", "--cached", "--name-only", "--diff-filter=ACMR"], cwd=repo_root)
-    return [p for p in cp.stdout.splitlines() if p.strip()]
+def _staged_blobs(repo_root: Path) -> list[tuple[str, str]]:
+    """
+    (path, staged blob id) for added/copied/modified/renamed files, from one `git diff --raw -z`.
+    NUL-separated output keeps paths verbatim (no core.quotePath quoting of non-ASCII names)
+    and the blob id lets cat-file read content without resolving paths again.
+    """
+    cp = _run_git(["diff", "--cached", "--raw", "-z", "--no-abbrev", "--diff-filter=ACMR"], cwd=repo_root)
+    fields = cp.stdout.split("\0")
+    blobs: list[tuple[str, str]] = []
+    i = 0
+    while i + 1 < len(fields):
+        # ":<old mode> <new mode> <old id> <new id> <status>", then the path(s).
+        meta = fields[i].split()
+        if len(meta) < 5:
+            break
+        # Renames/copies carry source and destination paths: the staged content is at the destination.
+        npaths = 2 if meta[4][:1] in ("R", "C") else 1
+        blobs.append((fields[i + npaths], meta[3]))
+        i += 1 + npaths
+    return blobs
+
+
+class _GitBatch:
+    """
+    Long-lived `git cat-file --batch` process: every object read goes over one pipe
+    instead of forking a new git process per file. If the process exits mid-run, the
+    batch is stopped and later reads fall back to one `git cat-file` per object.
+    """
+
+    _ARGS = ["git", "cat-file", "--batch"]
+
+    def __init__(self, repo_root: Path):
+        self._repo_root = repo_root
+        self._proc: Optional[subprocess.Popen[bytes]] = subprocess.Popen(
+            self._ARGS,
+            cwd=str(repo_root),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+        )
+
+    def read(self, rev: str, max_bytes: Optional[int] = None) -> bytes:
+        """
+        Return the raw content of blob `rev` (at most max_bytes of it; the rest is drained and
+        discarded); CalledProcessError if git cannot resolve it.
+        """
+        if self._proc is not None:
+            try:
+                data = self._read_batch(self._proc, rev, max_bytes)
+                reason = "truncated cat-file output"
+            except OSError as e:  # BrokenPipeError: cat-file exited before reading the request
+                data, reason = None, str(e)
+            if data is not None:
+                return data
+            sys.stderr.write(f"[auditor-gate] git cat-file --batch ended early ({reason}); "
+                             "reading objects one at a time\n")
+            self._stop()
+        return self._read_single(rev, max_bytes)
+
+    def _read_batch(self, proc: subprocess.Popen[bytes], rev: str, max_bytes: Optional[int]) -> Optional[bytes]:
+        """Content of `rev` from the batch process; None if the process ended mid-answer."""
+        assert proc.stdin is not None and proc.stdout is not None
+        proc.stdin.write(rev.encode("utf-8") + b"\n")
+        proc.stdin.flush()
+
+        # Header: "<sha> <type> <size>", or "<rev> missing" / "<rev> ambiguous".
+        header = proc.stdout.readline()
+        if not header.endswith(b"\n"):
+            return None
+        parts = header.split()
+        if len(parts) != 3:
+            reason = header.decode("utf-8", errors="replace").strip()
+            raise subprocess.CalledProcessError(128, self._ARGS, output="", stderr=reason)
+
+        size = int(parts[2])
+        keep = size if max_bytes is None else min(size, max_bytes)
+        data = proc.stdout.read(keep)
+        remaining = size - keep + 1  # dropped content + trailing LF
+        while remaining > 0:
+            chunk = proc.stdout.read(min(remaining, 1 << 16))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+        if len(data) != keep or remaining:
+            return None
+        return data
+
+    def _read_single(self, rev: str, max_bytes: Optional[int]) -> bytes:
+        # Same bytes as the batch answer; check=True raises CalledProcessError (stderr as bytes).
+        proc = subprocess.run(
+            ["git", "cat-file", "blob", rev],
+            cwd=str(self._repo_root),
+            capture_output=True,
+            check=True,
+        )
+        return proc.stdout if max_bytes is None else proc.stdout[:max_bytes]
+
+    def _stop(self) -> None:
+        proc, self._proc = self._proc, None
+        if proc is None:
+            return
+        try:
+            if proc.stdin is not None:
+                proc.stdin.close()
+        except OSError as e:  # BrokenPipeError: nothing left to deliver to an exited cat-file
+            sys.stderr.write(f"[auditor-gate] git cat-file --batch pipe already closed: {e}\n")
+        proc.wait()
+        if proc.stdout is not None:
+            proc.stdout.close()
+
+    def close(self) -> None:
+        self._stop()
+
+    def __enter__(self) -> "_GitBatch":
+        return self
 
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
 
-def _read_index_blob(repo_root: Path, path: str) -> str:
-    # ":" syntax reads from the index (staging area)
-    cp = _run_git(["show", f":{path}"], cwd=repo_root)
-    return cp.stdout
 
+_TRUNCATED_MARK = "\n... [truncated] ..."
+_DECODE_CHUNK = 1 << 16
 
-def _limit_text(text: str, limit_chars: int) -> str:
+
+def _limit_text(data: str | bytes, limit_chars: int) -> str:
+    """
+    Truncate text to limit_chars characters. Raw git output (bytes) is decoded like
+    _decode_git_text, but only as far as the kept prefix needs.
+    """
+    if isinstance(data, (bytes, bytearray)):
+        return _limit_git_bytes(data, limit_chars)
+    if len(data) <= limit_chars:
+        return data
+    return data[:limit_chars] + _TRUNCATED_MARK
+
+
+def _limit_git_bytes(data: bytes, limit_chars: int) -> str:
+    if len(data) <= limit_chars:
+        # At least one byte per character: the text cannot exceed the limit.
+        return _decode_git_text(data)
+
+    # Incremental decode: split multi-byte sequences and CRLF pairs are carried over chunk
+    # boundaries, so the result matches decoding the whole buffer and then truncating.
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    view = memoryview(data)
+    parts: list[str] = []
+    count = 0
+    carry = ""
+    for pos in range(0, len(data), _DECODE_CHUNK):
+        text = carry + decoder.decode(view[pos : pos + _DECODE_CHUNK])
+        carry = ""
+        if text.endswith("\r"):
+            text, carry = text[:-1], "\r"
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+        parts.append(text)
+        count += len(text)
+        if count > limit_chars:
+            return "".join(parts)[:limit_chars] + _TRUNCATED_MARK
+    tail = carry + decoder.decode(b"", final=True)
+    text = "".join(parts) + tail.replace("\r\n", "\n").replace("\r", "\n")
     if len(text) <= limit_chars:
         return text
-    return text[:limit_chars] + "\n... [truncated] ..."
+    return text[:limit_chars] + _TRUNCATED_MARK
+
+
+def _violation(res, location: str) -> Violation:
+    return Violation(
+        rule_name=res.rule_name,
+        severity=res.severity,
+        action=res.action,
+        description=res.description,
+        location=res.location or location,
+        suggestion=res.suggestion,
+    )
+
+
+def _file_edit_event(file_path: str, content: str) -> dict:
+    return {
+        "type": "tool",
+        "tool_name": "FileEdit",
+        "tool_input": {"file_path": file_path, "old_string": "", "new_string": content},
+    }
 
 
-def _analyze_staged_content(engine, repo_root: Path, max_chars_per_file: int) -> list[Violation]:
+def _collect_violations(engine, items: Iterator[tuple[str, dict]], fail_fast: bool) -> list[Violation]:
+    """Analyze (location, event) pairs produced lazily by `items`.
+
+    Default: materialize every event and analyze them as one batch, so files needing
+    AI analysis are sent to the LLM concurrently and the report is complete.
+    With fail_fast: analyze one event at a time and stop at the first blocking
+    violation; the generator is closed so remaining blobs/patches are never read.
+    """
     violations: list[Violation] = []
+    if fail_fast:
+        with closing(items):
+            for location, event in items:
+                res = engine.analyze_event(event)
+                if not res:
+                    continue
+                violations.append(_violation(res, location))
+                if res.action == "block":
+                    break
+        return violations
+
+    pending = list(items)
+    for (location, _), res in zip(pending, engine.analyze_events([event for _, event in pending])):
+        if res:
+            violations.append(_violation(res, location))
+    return violations
+
 
-    for p in _staged_paths(repo_root):
+def _staged_events(git_batch: _GitBatch, repo_root: Path, max_chars_per_file: int) -> Iterator[tuple[str, dict]]:
+    for p, blob in _staged_blobs(repo_root):
         try:
-            content = _read_index_blob(repo_root, p)
+            content = git_batch.read(blob, _utf8_cap(max_chars_per_file))
         except subprocess.CalledProcessError as e:
             # If a file cannot be read from index, skip with explicit rationale.
             # This keeps gating deterministic without blocking on non-text artifacts.
@@ -120,32 +366,14 @@ def _analyze_staged_content(engine, repo_root: Path, max_chars_per_file: int) ->
             sys.stderr.write(_limit_text(e.stderr, 1000) + "\n")
             continue
 
-        event = {
-            "type": "tool",
-            "tool_name": "FileEdit",
-            "tool_input": {
-                "file_path": p,
-                "old_string": "",
-                "new_string": _limit_text(content, max_chars_per_file),
-            },
-        }
-
-        res = engine.analyze_event(event)
-        if not res:
-            continue
+        yield p, _file_edit_event(p, _limit_text(content, max_chars_per_file))
 
-        violations.append(
-            Violation(
-                rule_name=res.rule_name,
-                severity=res.severity,
-                action=res.action,
-                description=res.description,
-                location=res.location or p,
-                suggestion=res.suggestion,
-            )
-        )
 
-    return violations
+def _analyze_staged_content(
+    engine, repo_root: Path, max_chars_per_file: int, fail_fast: bool = False
+) -> list[Violation]:
+    with _GitBatch(repo_root) as git_batch:
+        return _collect_violations(engine, _staged_events(git_batch, repo_root, max_chars_per_file), fail_fast)
 
 
 def _analyze_commit_message(engine, commit_msg_path: Path) -> list[Violation]:
@@ -186,17 +414,58 @@ def _rev_list(repo_root: Path, rev_range: str) -> list[str]:
     return [s for s in cp.stdout.splitlines() if s.strip()]
 
 
-def _commit_patch(repo_root: Path, sha: str, max_chars: int) -> str:
-    cp = _run_git(["show", "--format=", "--unified=0", sha], cwd=repo_root)
-    return _limit_text(cp.stdout, max_chars)
+def _commit_patches(repo_root: Path, shas: list[str], max_chars: int) -> list[str]:
+    """
+    Patches of `shas`, in order, from one `git show` process (same text as
+    `git show --format= --unified=0 <sha>` per commit). Each record is prefixed by a
+    NUL + sha header; per commit at most _utf8_cap(max_chars) bytes are kept and the
+    rest of its output is discarded while streaming.
+    """
+    if not shas:
+        return []
+    max_bytes = _utf8_cap(max_chars)
+    # Header "<sha>\n" plus the blank separator line git emits before a non-empty patch.
+    room = max_bytes + max(map(len, shas), default=0) + 2
+    proc = subprocess.Popen(
+        ["git", "show", "--format=%x00%H", "--unified=0", *shas],
+        cwd=str(repo_root),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+    assert proc.stdout is not None
+    records: list[bytearray] = []
+    current: Optional[bytearray] = None
+    for chunk in iter(lambda: proc.stdout.read(1 << 16), b""):
+        for i, part in enumerate(chunk.split(b"\0")):
+            if i:
+                current = bytearray()
+                records.append(current)
+            if current is not None and len(current) < room:
+                current += part[: room - len(current)]
+    _out, err = proc.communicate()
+    if proc.returncode != 0:
+        raise subprocess.CalledProcessError(
+            proc.returncode, proc.args, output="", stderr=err.decode("utf-8", errors="replace")
+        )
 
+    patches: list[str] = []
+    for sha, record in zip(shas, records):
+        header, _, patch = bytes(record).partition(b"\n")
+        if header.decode("ascii", errors="replace") != sha:
+            break
+        if patch.startswith(b"\n"):
+            patch = patch[1:]
+        patches.append(_limit_text(patch[:max_bytes], max_chars))
+    if len(patches) != len(shas) or len(records) != len(shas):
+        raise subprocess.CalledProcessError(128, proc.args, output="", stderr="unexpected git show output")
+    return patches
 
-def _analyze_pre_push(engine, repo_root: Path, stdin: str, max_chars_per_commit: int) -> list[Violation]:
-    violations: list[Violation] = []
+
+def _pre_push_events(repo_root: Path, stdin: str, max_chars_per_commit: int) -> Iterator[tuple[str, dict]]:
     for remote_sha, local_sha in _parse_pre_push_ranges(stdin):
-        if local_sha == "0" * 40:
+        if local_sha == ZERO_SHA:
             continue
-        is_bootstrap = remote_sha == "0" * 40
+        is_bootstrap = remote_sha == ZERO_SHA
         if is_bootstrap:
             # Incremental adoption: on an empty remote, limit analysis to last N commits.
             max_commits = int(os.environ.get(BOOTSTRAP_MAX_COMMITS_ENV, "50"))
@@ -206,49 +475,113 @@ def _analyze_pre_push(engine, repo_root: Path, stdin: str, max_chars_per_commit:
             rev_range = f"{remote_sha}..{local_sha}"
             shas = _rev_list(repo_root, rev_range)
 
-        for sha in shas:
-            patch = _commit_patch(repo_root, sha, max_chars_per_commit)
-            event = {
-                "type": "tool",
-                "tool_name": "FileEdit",
-                "tool_input": {
-                    "file_path": f"commit:{sha}",
-                    "old_string": "",
-                    "new_string": patch,
-                },
-            }
-            res = engine.analyze_event(event)
-            if not res:
-                continue
-            violations.append(
-                Violation(
-                    rule_name=res.rule_name,
-                    severity=res.severity,
-                    action=res.action,
-                    description=res.description,
-                    location=f"commit:{sha}",
-                    suggestion=res.suggestion,
-                )
-            )
-    return violations
+        # One git process per batch of commits instead of one per commit; batches run in parallel.
+        batches = [shas[k : k + PATCH_BATCH_SIZE] for k in range(0, len(shas), PATCH_BATCH_SIZE)]
+        with ThreadPoolExecutor(max_workers=GIT_WORKERS) as pool:
+            futures = [pool.submit(_commit_patches, repo_root, batch, max_chars_per_commit) for batch in batches]
+            try:
+                for batch, future in zip(batches, futures):
+                    for sha, patch in zip(batch, future.result()):
+                        location = f"commit:{sha}"
+                        yield location, _file_edit_event(location, patch)
+            finally:
+                # Early stop (fail-fast): do not wait for patches nobody will analyze.
+                for future in futures:
+                    future.cancel()
+
+
+def _analyze_pre_push(
+    engine, repo_root: Path, stdin: str, max_chars_per_commit: int, fail_fast: bool = False
+) -> list[Violation]:
+    return _collect_violations(engine, _pre_push_events(repo_root, stdin, max_chars_per_commit), fail_fast)
+
+
+def _read_worktree_text(repo_root: Path, p: str, max_chars: int) -> tuple[Optional[str], str]:
+    """(truncated text, "") for a readable text file, else (None, SKIP report for stderr)."""
+    try:
+        abs_p = _safe_repo_path(repo_root, p)
+        if abs_p is None:
+            return None, f"[auditor-gate] SKIP unsafe path: {p}\n"
+        buf = _read_text_file_capped(abs_p, _utf8_cap(max_chars))
+        if buf is None:
+            return None, f"[auditor-gate] SKIP non-text file: {p}\n"
+        return _limit_text(buf.decode("utf-8", errors="replace"), max_chars), ""
+    except OSError as e:
+        return None, f"[auditor-gate] SKIP unreadable file: {p}\n" + _limit_text(str(e), 500) + "\n"
+
+
+def _ci_events(repo_root: Path, rev_range: str, max_chars_per_file: int) -> Iterator[tuple[str, dict]]:
+    cp = _run_git(["diff", "--name-only", rev_range], cwd=repo_root)
+    paths = [p for p in cp.stdout.splitlines() if p.strip()]
+    resolved_root = repo_root.resolve()
+    # File reads are I/O-bound: overlap them on the worker pool, consume results in path order.
+    with ThreadPoolExecutor(max_workers=GIT_WORKERS) as pool:
+        futures = [pool.submit(_read_worktree_text, resolved_root, p, max_chars_per_file) for p in paths]
+        try:
+            for p, future in zip(paths, futures):
+                content, skip_report = future.result()
+                if content is None:
+                    sys.stderr.write(skip_report)
+                    continue
+                yield p, _file_edit_event(p, content)
+        finally:
+            # Early stop (fail-fast): do not wait for files nobody will analyze.
+            for future in futures:
+                future.cancel()
+
+
+def _render_violation(v: Violation) -> str:
+    line = f"- rule={v.rule_name} severity={v.severity} action={v.action} location={v.location} desc={v.description}\n"
+    if v.suggestion:
+        line += f"  suggestion: {v.suggestion}\n"
+    return line
 
 
 def _render_violations(violations: Iterable[Violation]) -> str:
-    out_lines: list[str] = []
-    for v in violations:
-        out_lines.append(
-            f"- rule={v.rule_name} severity={v.severity} action={v.action} location={v.location} desc={v.description}"
-        )
-        if v.suggestion:
-            out_lines.append(f"  suggestion: {v.suggestion}")
-    return "\n".join(out_lines)
+    # Newline-terminated lines, so the caller can emit the whole report in one write.
+    return "".join(_render_violation(v) for v in violations)
 
 
 def _has_blocking(violations: Iterable[Violation]) -> bool:
     return any(v.action == "block" for v in violations)
 
 
-def main(argv: list[str]) -> int:
+def _fail_fast_default() -> bool:
+    return os.environ.get(FAIL_FAST_ENV, "").strip().lower() in ("1", "true", "yes", "on")
+
+
+def _hook_args(argv: list[str]) -> Optional[SimpleNamespace]:
+    """Parse the exact argument shapes written by .githooks without argparse.
+
+    Hooks run on every commit/push: importing argparse and building the parser costs ~2ms.
+    Anything else (options, --help, malformed input) returns None and goes through
+    _parse_args, so errors and help output are unchanged.
+    """
+    cmd, rest = (argv[0], argv[1:]) if argv else (None, [])
+    if cmd in ("pre-commit", "install-hooks") and not rest:
+        extra = {}
+    elif cmd == "commit-msg" and len(rest) == 1:
+        extra = {"commit_msg_file": rest[0]}
+    elif cmd == "pre-push" and len(rest) == 4 and rest[0] == "--remote-name" and rest[2] == "--remote-url":
+        extra = {"remote_name": rest[1], "remote_url": rest[3]}
+    else:
+        return None
+    if any(v.startswith("-") for v in extra.values()):
+        # argparse would read these as options: let it report them.
+        return None
+    return SimpleNamespace(
+        config=None,
+        max_chars_per_file=DEFAULT_MAX_CHARS_PER_FILE,
+        max_chars_per_commit=DEFAULT_MAX_CHARS_PER_COMMIT,
+        fail_fast=_fail_fast_default(),
+        cmd=cmd,
+        **extra,
+    )
+
+
+def _parse_args(argv: list[str]):
+    import argparse
+
     ap = argparse.ArgumentParser(prog="auditor-gate")
     ap.add_argument(
         "--config",
@@ -259,15 +592,24 @@ def main(argv: list[str]) -> int:
     ap.add_argument(
         "--max-chars-per-file",
         type=int,
-        default=200_000,
+        default=DEFAULT_MAX_CHARS_PER_FILE,
         help="Max characters per staged file analyzed in pre-commit.",
     )
     ap.add_argument(
         "--max-chars-per-commit",
         type=int,
-        default=400_000,
+        default=DEFAULT_MAX_CHARS_PER_COMMIT,
         help="Max characters per commit patch analyzed in pre-push.",
     )
+    ap.add_argument(
+        "--fail-fast",
+        action="store_true",
+        default=_fail_fast_default(),
+        help=(
+            "Stop at the first blocking violation (the report lists only violations found so far). "
+            f"Default: on when {FAIL_FAST_ENV}=1."
+        ),
+    )
 
     sub = ap.add_subparsers(dest="cmd", required=True)
     sub.add_parser("pre-commit")
@@ -284,7 +626,11 @@ def main(argv: list[str]) -> int:
 
     sub.add_parser("install-hooks")
 
-    args = ap.parse_args(argv)
+    return ap.parse_args(argv)
+
+
+def main(argv: list[str]) -> int:
+    args = _hook_args(argv) or _parse_args(argv)
 
     repo_root = _repo_root()
     default_cfg = repo_root / "config" / "agent_config.yaml"
@@ -310,48 +656,16 @@ def main(argv: list[str]) -> int:
     engine = _load_engine(config_path)
     try:
         if args.cmd == "pre-commit":
-            violations = _analyze_staged_content(engine, repo_root, args.max_chars_per_file)
+            violations = _analyze_staged_content(engine, repo_root, args.max_chars_per_file, args.fail_fast)
         elif args.cmd == "commit-msg":
             violations = _analyze_commit_message(engine, Path(args.commit_msg_file))
         elif args.cmd == "pre-push":
             stdin = sys.stdin.read()
-            violations = _analyze_pre_push(engine, repo_root, stdin, args.max_chars_per_commit)
+            violations = _analyze_pre_push(engine, repo_root, stdin, args.max_chars_per_commit, args.fail_fast)
         elif args.cmd == "ci":
-            cp = _run_git(["diff", "--name-only", args.range], cwd=repo_root)
-            paths = [p for p in cp.stdout.splitlines() if p.strip()]
-            violations = []
-            for p in paths:
-                try:
-                    abs_p = _safe_repo_path(repo_root, p)
-                    if abs_p is None:
-                        sys.stderr.write(f"[auditor-gate] SKIP unsafe path: {p}\n")
-                        continue
-                    buf = abs_p.read_bytes()
-                    if not _is_text_file_bytes(buf):
-                        sys.stderr.write(f"[auditor-gate] SKIP non-text file: {p}\n")
-                        continue
-                    content = buf.decode("utf-8", errors="replace")
-                except OSError as e:
-                    sys.stderr.write(f"[auditor-gate] SKIP unreadable file: {p}\n")
-                    sys.stderr.write(_limit_text(str(e), 500) + "\n")
-                    continue
-                event = {
-                    "type": "tool",
-                    "tool_name": "FileEdit",
-                    "tool_input": {"file_path": p, "old_string": "", "new_string": _limit_text(content, args.max_chars_per_file)},
-                }
-                res = engine.analyze_event(event)
-                if res:
-                    violations.append(
-                        Violation(
-                            rule_name=res.rule_name,
-                            severity=res.severity,
-                            action=res.action,
-                            description=res.description,
-                            location=res.location or p,
-                            suggestion=res.suggestion,
-                        )
-                    )
+            violations = _collect_violations(
+                engine, _ci_events(repo_root, args.range, args.max_chars_per_file), args.fail_fast
+            )
         else:
             sys.stderr.write(f"[auditor-gate] unsupported cmd: {args.cmd}\n")
             return 2
@@ -359,15 +673,20 @@ def main(argv: list[str]) -> int:
         if not violations:
             return 0
 
-        sys.stderr.write("[auditor-gate] violations detected:\n")
-        sys.stderr.write(_render_violations(violations) + "\n")
-
-        if _has_blocking(violations):
-            sys.stderr.write("[auditor-gate] decision=DENY (blocking violation)\n")
-            return 1
-
-        sys.stderr.write("[auditor-gate] decision=ALLOW (no blocking violation)\n")
-        return 0
+        blocking = _has_blocking(violations)
+        # Single write: one syscall, and the report is not interleaved with git/child output.
+        sys.stderr.write(
+            "".join(
+                (
+                    "[auditor-gate] violations detected:\n",
+                    _render_violations(violations),
+                    "[auditor-gate] decision=DENY (blocking violation)\n"
+                    if blocking
+                    else "[auditor-gate] decision=ALLOW (no blocking violation)\n",
+                )
+            )
+        )
+        return 1 if blocking else 0
     finally:
         engine.stop()
 
@@ -9,14 +9,40 @@ Limiti:
 
 from __future__ import annotations
 
+import functools
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Callable, Dict, Optional
 
-try:
-    import yaml  # type: ignore
-except ModuleNotFoundError:  # pragma: no cover
-    yaml = None
+# Testi di config distinti di cui tenere il parsing (tipicamente uno per processo).
+_CONFIG_PARSE_CACHE_SIZE = 8
+
+
+def _yaml_safe_load() -> Optional[Callable[[str], Any]]:
+    """`yaml.load` con il loader safe più rapido (CSafeLoader di libyaml se disponibile).
+
+    pyyaml (~12 ms di import) viene importato solo al primo parsing: chi usa AgentConfig
+    senza file non lo carica. None se pyyaml non è installato.
+    """
+    try:
+        import yaml  # type: ignore
+    except ModuleNotFoundError:  # pragma: no cover
+        return None
+    return functools.partial(yaml.load, Loader=getattr(yaml, "CSafeLoader", None) or yaml.SafeLoader)
+
+
+@functools.lru_cache(maxsize=_CONFIG_PARSE_CACHE_SIZE)
+def _parse_config_text(text: str) -> Any:
+    """YAML di config parsato, memorizzato per contenuto (il dict è condiviso: solo lettura).
+
+    Chiave sul testo e non su (path, mtime): un file riscritto con lo stesso contenuto
+    non viene ri-parsato, e uno modificato nello stesso tick di mtime non restituisce
+    dati vecchi; from_text condivide la stessa cache. Gli errori di parsing non vengono memorizzati.
+    """
+    yaml_load = _yaml_safe_load()
+    if yaml_load is None:
+        raise RuntimeError("pyyaml non installato: impossibile parsare il YAML di configurazione.")
+    return yaml_load(text) or {}
 
 
 @dataclass
@@ -36,30 +62,59 @@ class AgentConfig:
     ollama_url: str = "http://localhost:11434"
     ollama_model: str = "codegeex"
     ai_timeout: int = 30
+    ai_connect_timeout: float = 3.0
     ai_temperature: float = 0.1
+    ai_batch_size: int = 1
+    ai_batch_chars: int = 60_000
+    ai_stream: bool = False
+
+    # Performance
+    max_concurrent_analyses: int = 5
+    cache_enabled: bool = True
+    cache_ttl_seconds: int = 300
+    cache_dir: str = ""
 
     @classmethod
     def from_file(cls, config_path: str | Path | None) -> "AgentConfig":
-        if not config_path:
-            return cls()
+        return cls(**cls._load_fields(config_path))
 
-        if yaml is None:
+    @classmethod
+    def from_text(cls, text: str) -> "AgentConfig":
+        """Config da YAML già in memoria (es. nei test): nessun file da scrivere e rileggere."""
+        cls._require_yaml()
+        return cls(**cls._fields_from_data(_parse_config_text(text)))
+
+    @staticmethod
+    def _require_yaml() -> None:
+        if _yaml_safe_load() is None:
             raise RuntimeError(
                 "pyyaml non installato: impossibile caricare config YAML. "
                 "Installa le dipendenze (pip install -r requirements.txt) oppure avvia senza config."
             )
 
+    @staticmethod
+    def _load_fields(config_path: str | Path | None) -> Dict[str, Any]:
+        """Valori dei campi letti dal YAML (dict vuoto senza config_path)."""
+        if not config_path:
+            return {}
+
+        AgentConfig._require_yaml()
+
         path = Path(config_path)
         if not path.exists():
             raise FileNotFoundError(f"Config non trovata: {path}")
 
-        data = yaml.safe_load(path.read_text(encoding="utf-8")) or {}
+        return AgentConfig._fields_from_data(_parse_config_text(path.read_text(encoding="utf-8")))
 
+    @staticmethod
+    def _fields_from_data(data: Dict[str, Any]) -> Dict[str, Any]:
+        """Valori dei campi a partire dal YAML già parsato."""
         agent = data.get("agent", {}) or {}
         auditing = data.get("auditing", {}) or {}
         ai = data.get("ai", {}) or {}
+        performance = data.get("performance", {}) or {}
 
-        return cls(
+        return dict(
             agent_name=str(agent.get("name", "auditor")),
             mode=str(agent.get("mode", "warn")),
             target_instance=agent.get("target_instance", None),
@@ -70,23 +125,20 @@ class AgentConfig:
             ollama_url=str(ai.get("ollama_url", "http://localhost:11434")),
             ollama_model=str(ai.get("ollama_model", "codegeex")),
             ai_timeout=int(ai.get("ai_timeout", 30)),
+            ai_connect_timeout=float(ai.get("ai_connect_timeout", 3.0)),
             ai_temperature=float(ai.get("ai_temperature", 0.1)),
+            ai_batch_size=int(ai.get("ai_batch_size", 1)),
+            ai_batch_chars=int(ai.get("ai_batch_chars", 60_000)),
+            ai_stream=bool(ai.get("ai_stream", False)),
+            max_concurrent_analyses=int(performance.get("max_concurrent_analyses", 5)),
+            cache_enabled=bool(performance.get("cache_enabled", True)),
+            cache_ttl_seconds=int(performance.get("cache_ttl_seconds", 300)),
+            cache_dir=str(performance.get("cache_dir") or ""),
         )
 
     def __init__(self, config_path: str | Path | None = None, **overrides: Any):
-        cfg = self.from_file(config_path) if config_path else None
-        if cfg:
-            self.agent_name = cfg.agent_name
-            self.mode = cfg.mode
-            self.target_instance = cfg.target_instance
-            self.enable_dashboard = cfg.enable_dashboard
-            self.verbose = cfg.verbose
-            self.rules_path = cfg.rules_path
-            self.enable_ai = cfg.enable_ai
-            self.ollama_url = cfg.ollama_url
-            self.ollama_model = cfg.ollama_model
-            self.ai_timeout = cfg.ai_timeout
-            self.ai_temperature = cfg.ai_temperature
+        # Campi assegnati direttamente: nessuna istanza temporanea da copiare attributo per attributo.
+        self.__dict__.update(self._load_fields(config_path))
         # Override da kwargs
         for k, v in overrides.items():
             if hasattr(self, k):
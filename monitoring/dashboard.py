@@ -5,13 +5,31 @@ Mostra statistiche in tempo reale e stato del sistema.
 
 import time
 import threading
-from typing import Dict, Any
-from rich.console import Console
+from typing import Any, Callable, Dict, Optional, Tuple
+from rich.console import Console, Group
 from rich.panel import Panel
 from rich.table import Table
 from rich.live import Live
 from rich.text import Text
 
+# Righe della tabella principale (etichetta, chiave in stats): la tabella si ricostruisce solo se cambiano i valori.
+_MAIN_STATS_ROWS = (
+    ("📥 Eventi Processati", 'events_processed'),
+    ("🔍 Problemi Rilevati", 'issues_found'),
+    ("⚠️ Avvisi Inviati", 'warnings_sent'),
+    ("🚫 Blocchi Applicati", 'blocks_applied'),
+    ("👥 Istanze Attive", 'active_instances'),
+)
+
+# Riga vuota tra le sezioni del pannello principale.
+_BLANK = Text("")
+
+# Severità che log_event conta come problemi rilevati.
+_ISSUE_SEVERITIES = frozenset(('warning', 'error', 'high'))
+
+# Intervallo minimo tra due ridisegni: una raffica di update_stats produce al più 4 refresh/s.
+_MIN_REFRESH_INTERVAL = 0.25
+
 
 class MonitoringDashboard:
     """Dashboard di monitoraggio per l'Auditor Agent."""
@@ -32,6 +50,16 @@ class MonitoringDashboard:
             'active_instances': 0
         }
         self.thread = None
+        # Impostato da update_stats/log_event/stop: il loop ridisegna solo quando serve.
+        self._dirty = threading.Event()
+        # Righe fisse del pannello di stato, costruite al primo uso dopo start() (la CLI
+        # modifica mode/target dopo la creazione della dashboard).
+        self._static_status_text = None
+        # Renderable già costruiti, per nome: (chiave dei valori mostrati, oggetto Rich).
+        self._render_cache: Dict[str, Tuple[Any, Any]] = {}
+        # Ultimo testo formattato per secondo: più ridisegni nello stesso secondo lo riusano.
+        self._uptime_text: Tuple[int, str] = (-1, "")
+        self._time_ago_text: Tuple[int, str] = (-1, "")
 
     def start(self):
         """Avvia la dashboard."""
@@ -39,11 +67,12 @@ class MonitoringDashboard:
             return
 
         self.running = True
+        self._static_status_text = None
+        self._render_cache.clear()
         self.thread = threading.Thread(target=self._dashboard_loop, daemon=True)
         self.thread.start()
 
-        print("📊 Dashboard di monitoraggio avviata")
-        print("Premi Ctrl+C per interrompere")
+        print("📊 Dashboard di monitoraggio avviata\nPremi Ctrl+C per interrompere")
 
     def update(self):
         """
@@ -55,50 +84,69 @@ class MonitoringDashboard:
     def stop(self):
         """Ferma la dashboard."""
         self.running = False
+        self._dirty.set()
         if self.thread:
             self.thread.join(timeout=1)
         print("📊 Dashboard fermata")
 
     def update_stats(self, new_stats: Dict[str, Any]):
-        """Aggiorna le statistiche."""
-        self.stats.update(new_stats)
-        self.stats['last_event_time'] = time.time()
+        """Aggiorna le statistiche.
+
+        Il dict viene sostituito, non modificato: il thread della dashboard legge sempre uno
+        snapshot completo (vecchio o nuovo), senza lock.
+        """
+        self.stats = {**self.stats, **new_stats, 'last_event_time': time.time()}
+        self._dirty.set()
 
     def _dashboard_loop(self):
         """Loop principale della dashboard."""
-        start_time = time.time()
+        # Orologio monotono: l'uptime non salta con le correzioni dell'ora di sistema (NTP).
+        start_time = time.monotonic()
 
-        with Live(console=self.console, refresh_per_second=2) as live:
+        # Niente auto-refresh di Live: si ridisegna solo dopo un cambiamento.
+        with Live(console=self.console, auto_refresh=False) as live:
             while self.running:
-                # Aggiorna uptime
-                self.stats['uptime_seconds'] = int(time.time() - start_time)
-
-                # Crea il display
-                display = self._create_display()
+                self._dirty.clear()
+                drawn_at = time.monotonic()
+
+                # Snapshot del frame (update_stats sostituisce il dict); uptime scritto solo
+                # quando cambia il secondo, con un assegnamento di una sola chiave (mai una
+                # sostituzione del dict da questo thread, che potrebbe perdere un update_stats).
+                stats = self.stats
+                uptime = int(drawn_at - start_time)
+                if stats['uptime_seconds'] != uptime:
+                    stats['uptime_seconds'] = uptime
+
+                # Crea il display e ridisegna
+                live.update(self._create_display(stats), refresh=True)
+
+                # Attesa fino al prossimo secondo di uptime (cambia il testo mostrato) o a un update_stats
+                self._dirty.wait(1.0 - (time.monotonic() - start_time) % 1.0)
+                if self.running:
+                    time.sleep(max(0.0, drawn_at + _MIN_REFRESH_INTERVAL - time.monotonic()))
+
+    def _create_display(self, stats: Optional[Dict[str, Any]] = None) -> Panel:
+        """Crea il pannello principale della dashboard da uno snapshot delle statistiche (default: quelle correnti)."""
+        if stats is None:
+            stats = self.stats
 
-                # Aggiorna live display
-                live.update(display)
-
-                # Pausa
-                time.sleep(0.5)
-
-    def _create_display(self) -> Panel:
-        """Crea il pannello principale della dashboard."""
         # Header
         header = Text("🤖 Auditor Agent Dashboard", style="bold blue")
-        header.append(f"\n🟢 Attivo - Uptime: {self._format_uptime()}", style="green")
+        header.append(f"\n🟢 Attivo - Uptime: {self._format_uptime(stats['uptime_seconds'])}", style="green")
 
         # Statistiche principali
-        main_stats = self._create_main_stats_table()
+        values = tuple(stats[key] for _, key in _MAIN_STATS_ROWS)
+        main_stats = self._cached('main_stats', values, lambda: self._create_main_stats_table(values))
 
-        # Stato sistema
-        system_status = self._create_system_status()
+        # Stato sistema: cambia solo con il testo "Ultimo Evento"
+        last_event = self._format_last_event(stats['last_event_time'])
+        system_status = self._cached('system_status', last_event, lambda: self._create_system_status(last_event))
 
-        # Log recenti (placeholder)
-        recent_activity = self._create_recent_activity()
+        # Log recenti (placeholder statico)
+        recent_activity = self._cached('recent_activity', None, self._create_recent_activity)
 
-        # Combina tutto
-        content = f"{header}\n\n{main_stats}\n\n{system_status}\n\n{recent_activity}"
+        # Combina tutto: Group mantiene i renderable (una f-string li ridurrebbe al loro repr)
+        content = Group(header, _BLANK, main_stats, _BLANK, system_status, _BLANK, recent_activity)
 
         return Panel(
             content,
@@ -107,41 +155,38 @@ class MonitoringDashboard:
             padding=(1, 2)
         )
 
-    def _create_main_stats_table(self) -> Table:
-        """Crea tabella statistiche principali."""
+    def _cached(self, name: str, key: Any, build: Callable[[], Any]) -> Any:
+        """Restituisce il renderable `name`, ricostruendolo solo se `key` è cambiata."""
+        hit = self._render_cache.get(name)
+        if hit is not None and hit[0] == key:
+            return hit[1]
+        renderable = build()
+        self._render_cache[name] = (key, renderable)
+        return renderable
+
+    def _create_main_stats_table(self, values: Tuple[Any, ...]) -> Table:
+        """Crea tabella statistiche principali (valori nell'ordine di _MAIN_STATS_ROWS)."""
         table = Table(title="📈 Statistiche Principali")
         table.add_column("Metrica", style="cyan")
         table.add_column("Valore", style="magenta", justify="right")
         table.add_column("Stato", style="green")
 
-        stats_data = [
-            ("Eventi Processati", self.stats['events_processed'], "📥"),
-            ("Problemi Rilevati", self.stats['issues_found'], "🔍"),
-            ("Avvisi Inviati", self.stats['warnings_sent'], "⚠️"),
-            ("Blocchi Applicati", self.stats['blocks_applied'], "🚫"),
-            ("Istanze Attive", self.stats['active_instances'], "👥"),
-        ]
-
-        for metric, value, icon in stats_data:
-            status = "🟢" if value > 0 else "⚪"
-            table.add_row(f"{icon} {metric}", str(value), status)
+        for (label, _), value in zip(_MAIN_STATS_ROWS, values):
+            table.add_row(label, str(value), "🟢" if value > 0 else "⚪")
 
         return table
 
-    def _create_system_status(self) -> Panel:
+    def _create_system_status(self, last_event: str) -> Panel:
         """Crea pannello stato sistema."""
-        last_event = "Mai" if not self.stats['last_event_time'] else \
-                    self._format_time_ago(self.stats['last_event_time'])
-
-        status_lines = [
-            f"🕐 Ultimo Evento: {last_event}",
-            f"⚙️  Modalità: {self.config.mode.upper()}",
-            f"🎯 Target: {self.config.target_instance or 'Tutte le istanze'}",
-            f"🔧 Rules file: {getattr(self.config, 'rules_path', 'N/A')}"
-        ]
+        if self._static_status_text is None:
+            self._static_status_text = "\n".join([
+                f"⚙️  Modalità: {self.config.mode.upper()}",
+                f"🎯 Target: {self.config.target_instance or 'Tutte le istanze'}",
+                f"🔧 Rules file: {getattr(self.config, 'rules_path', 'N/A')}"
+            ])
 
         return Panel(
-            "\n".join(status_lines),
+            f"🕐 Ultimo Evento: {last_event}\n{self._static_status_text}",
             title="🔧 Stato Sistema",
             border_style="yellow"
         )
@@ -161,33 +206,49 @@ class MonitoringDashboard:
             border_style="green"
         )
 
-    def _format_uptime(self) -> str:
+    def _format_last_event(self, last_event_time: Optional[float]) -> str:
+        """Testo "Ultimo Evento" del pannello di stato."""
+        if not last_event_time:
+            return "Mai"
+        return self._format_time_ago(last_event_time)
+
+    def _format_uptime(self, uptime: int) -> str:
         """Formatta l'uptime in modo leggibile."""
-        seconds = self.stats['uptime_seconds']
-        hours, remainder = divmod(seconds, 3600)
+        if uptime == self._uptime_text[0]:
+            return self._uptime_text[1]
+
+        hours, remainder = divmod(uptime, 3600)
         minutes, seconds = divmod(remainder, 60)
 
         if hours > 0:
-            return f"{hours}h {minutes}m {seconds}s"
+            text = f"{hours}h {minutes}m {seconds}s"
         elif minutes > 0:
-            return f"{minutes}m {seconds}s"
+            text = f"{minutes}m {seconds}s"
         else:
-            return f"{seconds}s"
+            text = f"{seconds}s"
+        self._uptime_text = (uptime, text)
+        return text
 
     def _format_time_ago(self, timestamp: float) -> str:
         """Formatta il tempo trascorso."""
         seconds_ago = int(time.time() - timestamp)
+        if seconds_ago == self._time_ago_text[0]:
+            return self._time_ago_text[1]
 
         if seconds_ago < 60:
-            return f"{seconds_ago}s fa"
+            text = f"{seconds_ago}s fa"
         elif seconds_ago < 3600:
-            return f"{seconds_ago // 60}m fa"
+            text = f"{seconds_ago // 60}m fa"
         else:
-            return f"{seconds_ago // 3600}h fa"
+            text = f"{seconds_ago // 3600}h fa"
+        self._time_ago_text = (seconds_ago, text)
+        return text
 
     def log_event(self, event_type: str, description: str, severity: str = "info"):
         """Logga un evento nella dashboard."""
         # Qui potremmo aggiungere una coda di eventi recenti
         # Per ora, solo aggiorna le statistiche se necessario
-        if severity in ['warning', 'error', 'high']:
-            self.stats['issues_found'] += 1
+        if severity in _ISSUE_SEVERITIES:
+            stats = self.stats
+            self.stats = {**stats, 'issues_found': stats['issues_found'] + 1}
+            self._dirty.set()
@@ -5,22 +5,45 @@ Installa dipendenze e configura l'ambiente.
 """
 
 import sys
+import shutil
 import subprocess
 import os
-from pathlib import Path
+
+
+# Contenuto di .env.example scritto da create_env_file
+ENV_EXAMPLE_FILE = ".env.example"
+ENV_TEMPLATE = """# Configurazione Auditor Agent
+# Copia questo file come .env e configura i valori necessari
+
+# GitHub (opzionale, per analisi repository avanzate)
+# GITHUB_TOKEN=your_github_token_here
+
+# OpenAI (opzionale, per analisi AI avanzate)
+# OPENAI_API_KEY=your_openai_key_here
+
+# Slack webhook (opzionale, per notifiche)
+# SLACK_WEBHOOK_URL=https://hooks.slack.com/services/...
+
+# Configurazione database hcom
+# HCOM_DB_PATH=~/.hcom/db.sqlite
+
+# Log level
+# LOG_LEVEL=INFO
+"""
 
 
 def run_command(cmd, description):
-    """Esegue un comando e gestisce gli errori."""
+    """Esegue un comando (lista argv, senza shell) e gestisce gli errori.
+
+    L'output del comando va direttamente sul terminale (nessun buffer in memoria).
+    """
     print(f"🔧 {description}...")
     try:
-        result = subprocess.run(cmd, shell=True, check=True,
-                              capture_output=True, text=True)
+        subprocess.run(cmd, check=True)
         print(f"✅ {description} completato")
         return True
-    except subprocess.CalledProcessError as e:
+    except (subprocess.CalledProcessError, OSError) as e:
         print(f"❌ Errore in {description}: {e}")
-        print(f"Output: {e.output}")
         return False
 
 
@@ -42,25 +65,20 @@ def install_dependencies():
         "requests",           # Per API calls
     ]
 
-    success = True
-    for dep in dependencies:
-        if not run_command(f"pip install {dep}", f"Installazione {dep}"):
-            success = False
-
-    return success
+    # Un solo pip (dell'interprete corrente): avvio e risoluzione delle dipendenze una volta sola.
+    return run_command(
+        [sys.executable, "-m", "pip", "install", *dependencies],
+        f"Installazione {', '.join(dependencies)}",
+    )
 
 
 def setup_directories():
     """Crea le directory necessarie."""
-    directories = [
-        "logs",
-        "cache",
-        "reports"
-    ]
+    directories = ("logs", "cache", "reports")
 
     for dir_name in directories:
-        Path(dir_name).mkdir(exist_ok=True)
-        print(f"📁 Directory {dir_name} creata")
+        os.makedirs(dir_name, exist_ok=True)
+    print(f"📁 Directory create: {', '.join(directories)}")
 
     return True
 
@@ -69,28 +87,29 @@ def setup_hcom():
     """Configura claude-hook-comms."""
     print("🔗 Configurazione claude-hook-comms...")
 
-    # Verifica se hcom è disponibile
+    # Verifica se hcom è disponibile: ricerca nel PATH (economica), poi avvio del CLI per
+    # accorgersi di un'installazione rotta.
+    if shutil.which("hcom") is None:
+        print("❌ hcom non installato. Installa con: pip install hcom")
+        return False
+
     try:
-        result = subprocess.run(["hcom", "--help"],
-                              capture_output=True, timeout=10)
-        if result.returncode == 0:
-            print("✅ hcom già installato")
-
-            # Inizializza hcom se necessario
-            try:
-                subprocess.run(["hcom", "list"], capture_output=True, timeout=5)
-            except subprocess.CalledProcessError:
-                print("🔧 Inizializzazione hcom...")
-                subprocess.run(["hcom"], timeout=10)
-
-            return True
-        else:
+        result = subprocess.run(["hcom", "--help"], capture_output=True, timeout=10)
+        if result.returncode != 0:
             print("❌ hcom non funzionante")
             return False
 
-    except FileNotFoundError:
-        print("❌ hcom non installato. Installa con: pip install hcom")
-        return False
+        print("✅ hcom già installato")
+
+        # Inizializza hcom se necessario
+        try:
+            subprocess.run(["hcom", "list"], capture_output=True, timeout=5)
+        except subprocess.CalledProcessError:
+            print("🔧 Inizializzazione hcom...")
+            subprocess.run(["hcom"], timeout=10)
+
+        return True
+
     except Exception as e:
         print(f"❌ Errore configurazione hcom: {e}")
         return False
@@ -98,29 +117,9 @@ def setup_hcom():
 
 def create_env_file():
     """Crea file .env di esempio."""
-    env_content = """# Configurazione Auditor Agent
-# Copia questo file come .env e configura i valori necessari
-
-# GitHub (opzionale, per analisi repository avanzate)
-# GITHUB_TOKEN=your_github_token_here
-
-# OpenAI (opzionale, per analisi AI avanzate)
-# OPENAI_API_KEY=your_openai_key_here
-
-# Slack webhook (opzionale, per notifiche)
-# SLACK_WEBHOOK_URL=https://hooks.slack.com/services/...
-
-# Configurazione database hcom
-# HCOM_DB_PATH=~/.hcom/db.sqlite
-
-# Log level
-# LOG_LEVEL=INFO
-"""
-
-    env_file = Path(".env.example")
-    if not env_file.exists():
-        with open(env_file, 'w') as f:
-            f.write(env_content)
+    if not os.path.exists(ENV_EXAMPLE_FILE):
+        with open(ENV_EXAMPLE_FILE, 'w') as f:
+            f.write(ENV_TEMPLATE)
         print("📄 File .env.example creato")
         print("   Copialo come .env e configura le variabili necessarie")
 
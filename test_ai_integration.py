@@ -26,6 +26,23 @@ class TestAIIntegration:
         self.ollama_url = ollama_url
         self.model = model
         self.client = OllamaClient(ollama_url, model)
+        # Analyzer ed engine condivisi tra i test: costruiti (e avviati) una volta sola.
+        self.analyzer = AIAnalyzer(ollama_url, model)
+        self._engines = {}
+
+    def _engine(self, enable_ai: bool) -> AuditorEngine:
+        """Engine avviato con AI attiva o meno, creato al primo uso e fermato in cleanup()."""
+        engine = self._engines.get(enable_ai)
+        if engine is None:
+            config = AgentConfig()
+            config.enable_ai = enable_ai
+            if enable_ai:
+                config.ollama_url = self.ollama_url
+                config.ollama_model = self.model
+            engine = AuditorEngine(config)
+            engine.start()
+            self._engines[enable_ai] = engine
+        return engine
 
     def test_ollama_connection(self):
         """Test connessione a Ollama."""
@@ -62,13 +79,10 @@ class TestAIIntegration:
             }
         ]
 
-        analyzer = AIAnalyzer(self.ollama_url, self.model)
-
-        for i, test_case in enumerate(test_cases, 1):
-            print(f"\n📝 Test {i}: {test_case['description']}")
-
-            # Crea evento simulato
-            event = {
+        # Eventi simulati, analizzati in un solo batch: le chiamate a Ollama (I/O-bound)
+        # vengono eseguite in parallelo dall'analyzer; i risultati sono stampati in ordine.
+        events = [
+            {
                 "type": "tool",
                 "tool_name": "FileEdit",
                 "tool_input": {
@@ -76,15 +90,20 @@ class TestAIIntegration:
                     "new_string": test_case["code"]
                 }
             }
+            for i, test_case in enumerate(test_cases, 1)
+        ]
 
-            start_time = time.time()
-            result = analyzer.analyze_event(event)
-            end_time = time.time()
+        start_time = time.time()
+        results = self.analyzer.analyze_events(events)
+        end_time = time.time()
+        print(f"\n⏱️  Tempo totale ({len(events)} analisi in parallelo): {end_time - start_time:.2f}s")
+
+        for i, (test_case, result) in enumerate(zip(test_cases, results), 1):
+            print(f"\n📝 Test {i}: {test_case['description']}")
 
             if result:
                 print(f"   ✅ Rilevato: {result.rule_name} ({result.severity})")
                 print(f"   💡 Suggerimento: {result.suggestion[:100]}...")
-                print(f"   ⏱️  Tempo: {end_time - start_time:.2f}s")
                 success = result.severity in ["high", "critical"] if test_case["expected_risk"] in ["high", "critical"] else result.severity == "low"
             else:
                 print("   ⚪ Nessun problema rilevato")
@@ -101,21 +120,8 @@ class TestAIIntegration:
         """Confronta AI analysis vs pattern matching."""
         print("\n🧪 Confronto AI vs Pattern Matching")
 
-        # Crea config senza AI
-        config_no_ai = AgentConfig()
-        config_no_ai.enable_ai = False
-
-        # Crea config con AI
-        config_with_ai = AgentConfig()
-        config_with_ai.enable_ai = True
-        config_with_ai.ollama_url = self.ollama_url
-        config_with_ai.ollama_model = self.model
-
-        engine_no_ai = AuditorEngine(config_no_ai)
-        engine_no_ai.start()
-
-        engine_with_ai = AuditorEngine(config_with_ai)
-        engine_with_ai.start()
+        engine_no_ai = self._engine(enable_ai=False)
+        engine_with_ai = self._engine(enable_ai=True)
 
         # Test case complesso che pattern matching potrebbe non cogliere
         complex_code = '''
@@ -169,9 +175,6 @@ def complex_function():
         else:
             print("   ⚪ Nessun problema rilevato")
 
-        engine_no_ai.stop()
-        engine_with_ai.stop()
-
         print(f"\n📊 Confronto:")
         print(f"   Pattern matching: {'✅' if pattern_result else '❌'}")
         print(f"   AI Analysis: {'✅' if ai_result else '❌'}")
@@ -182,38 +185,54 @@ def complex_function():
         """Test performance AI analysis."""
         print("\n🧪 Test Performance AI")
 
-        analyzer = AIAnalyzer(self.ollama_url, self.model)
+        analyzer = self.analyzer
 
-        simple_code = 'print("hello")'
-        event = {
-            "type": "tool",
-            "tool_name": "FileEdit",
-            "tool_input": {
-                "file_path": "test.py",
-                "new_string": simple_code
+        def make_event(simple_code: str) -> dict:
+            return {
+                "type": "tool",
+                "tool_name": "FileEdit",
+                "tool_input": {
+                    "file_path": "test.py",
+                    "new_string": simple_code
+                }
             }
-        }
 
-        # Test 5 analisi consecutive
-        times = []
-        for i in range(5):
-            start = time.time()
+        # Funzioni minime: `def ` supera il pre-filtro keyword, quindi ogni analisi arriva all'LLM.
+        # Warm-up fuori dalla misura: caricamento del modello in Ollama e apertura della connessione
+        analyzer.analyze_event(make_event('def warm_up():\n    print("hello")'))
+
+        # Test 5 analisi consecutive, su codice diverso: con lo stesso codice dalla seconda
+        # in poi si misurerebbe solo la cache dei risultati dell'analyzer.
+        # perf_counter_ns: orologio monotono ad alta risoluzione; min/max/somma aggiornati in un solo passaggio.
+        runs = 5
+        total_ns, min_ns, max_ns = 0, None, 0
+        for i in range(runs):
+            event = make_event(f'def hello_{i}():\n    print("hello")')
+            start = time.perf_counter_ns()
             result = analyzer.analyze_event(event)
-            end = time.time()
-            times.append(end - start)
-            print(f"   ⏱️  Analisi {i+1}: {end - start:.2f}s")
+            elapsed_ns = time.perf_counter_ns() - start
+            total_ns += elapsed_ns
+            min_ns = elapsed_ns if min_ns is None else min(min_ns, elapsed_ns)
+            max_ns = max(max_ns, elapsed_ns)
+            print(f"   ⏱️  Analisi {i+1}: {elapsed_ns / 1e9:.2f}s")
             if result:
                 print(f"   ✅ Analisi {i+1} completata")
             else:
                 print(f"   ⚠️  Analisi {i+1} senza risultato")
 
-        avg_time = sum(times) / len(times)
-        print(".2f")
-        print(f"   📈 Min: {min(times):.2f}s, Max: {max(times):.2f}s")
+        avg_time = total_ns / runs / 1e9
+        print(f"   📊 Media: {avg_time:.2f}s")
+        print(f"   📈 Min: {min_ns / 1e9:.2f}s, Max: {max_ns / 1e9:.2f}s")
 
         # AI dovrebbe essere ragionevolmente veloce (< 10s media)
         return avg_time < 10.0
 
+    def cleanup(self):
+        """Ferma gli engine avviati dai test."""
+        for engine in self._engines.values():
+            engine.stop()
+        self._engines.clear()
+
 
 def main():
     """Esegue tutti i test AI."""
@@ -231,38 +250,42 @@ def main():
 
     test_suite = TestAIIntegration(OLLAMA_URL, MODEL)
 
-    tests = [
-        ("Ollama Connection", test_suite.test_ollama_connection),
-        ("Simple AI Analysis", test_suite.test_simple_ai_analysis),
-        ("AI vs Pattern Comparison", test_suite.test_ai_vs_pattern_comparison),
-        ("AI Performance", test_suite.test_performance_ai),
-    ]
-
-    passed = 0
-    total = len(tests)
-
-    for test_name, test_func in tests:
-        try:
-            if test_func():
-                print(f"✅ {test_name}: PASSED")
-                passed += 1
-            else:
-                print(f"❌ {test_name}: FAILED")
-        except Exception as e:
-            print(f"❌ {test_name}: ERROR - {e}")
-
-    print("\n" + "=" * 50)
-    print(f"📊 Risultati: {passed}/{total} test passati")
-
-    if passed == total:
-        print("🎉 Tutti i test AI passati! Integrazione Ollama funzionante.")
-        return 0
-    elif passed >= total * 0.5:  # Almeno metà dei test
-        print("⚠️  Alcuni test AI falliti, ma connessione base OK.")
-        return 1
-    else:
-        print("❌ Problemi significativi con integrazione AI.")
-        return 2
+    try:
+        tests = [
+            ("Ollama Connection", test_suite.test_ollama_connection),
+            ("Simple AI Analysis", test_suite.test_simple_ai_analysis),
+            ("AI vs Pattern Comparison", test_suite.test_ai_vs_pattern_comparison),
+            ("AI Performance", test_suite.test_performance_ai),
+        ]
+
+        passed = 0
+        total = len(tests)
+
+        for test_name, test_func in tests:
+            try:
+                if test_func():
+                    print(f"✅ {test_name}: PASSED")
+                    passed += 1
+                else:
+                    print(f"❌ {test_name}: FAILED")
+            except Exception as e:
+                print(f"❌ {test_name}: ERROR - {e}")
+
+        print("\n" + "=" * 50)
+        print(f"📊 Risultati: {passed}/{total} test passati")
+
+        if passed == total:
+            print("🎉 Tutti i test AI passati! Integrazione Ollama funzionante.")
+            return 0
+        elif passed >= total * 0.5:  # Almeno metà dei test
+            print("⚠️  Alcuni test AI falliti, ma connessione base OK.")
+            return 1
+        else:
+            print("❌ Problemi significativi con integrazione AI.")
+            return 2
+
+    finally:
+        test_suite.cleanup()
 
 
 if __name__ == "__main__":